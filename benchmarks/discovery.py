@@ -0,0 +1,54 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.discovery import discover, result_count  # noqa: E402
+from utils.logger import configure_logging  # noqa: E402
+from utils.prepare_work import PRODUCT_LINK_SELECTOR, preparation_before_work  # noqa: E402
+from utils.records import sku_from_url  # noqa: E402
+from utils.scroll import page_down  # noqa: E402
+
+
+def baseline(query: str) -> tuple[set[int], float, int | None]:
+    """Одна бесконечная прокрутка выдачи, как в main без сегментов."""
+    started = time.perf_counter()
+    driver = preparation_before_work(item_name=query)
+    try:
+        reported = result_count(driver)
+        links = page_down(
+            driver=driver,
+            css_selector=PRODUCT_LINK_SELECTOR,
+            colvo=0,
+            temp_file=f"temp_links_baseline_{query.replace(' ', '_')}.txt",
+        )
+    finally:
+        driver.quit()
+    skus = {sku for url in links if (sku := sku_from_url(url)) is not None}
+    return skus, time.perf_counter() - started, reported
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Охват и время поиска по сегментам против одной прокрутки"
+    )
+    parser.add_argument("query", nargs="?", default="кран шаровой")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--shard-limit", type=int, default=1000)
+    args = parser.parse_args()
+    configure_logging(log_file="discovery_bench.log")
+
+    skus, elapsed, reported = baseline(args.query)
+    print(f"Одна прокрутка: {len(skus)} товаров за {elapsed:.0f} с (в выдаче {reported})")
+
+    started = time.perf_counter()
+    urls = discover(args.query, workers=args.workers, shard_limit=args.shard_limit)
+    elapsed = time.perf_counter() - started
+    sharded = {sku for url in urls if (sku := sku_from_url(url)) is not None}
+    print(
+        f"Сегменты, воркеров {args.workers}: {len(sharded)} товаров за {elapsed:.0f} с; "
+        f"не найдено прокруткой {len(sharded - skus)}, "
+        f"не найдено сегментами {len(skus - sharded)}"
+    )
@@ -0,0 +1,66 @@
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.price_history import PriceHistory  # noqa: E402
+from utils.records import ProductRecord  # noqa: E402
+
+
+def bench(skus: int, runs: int, change_rate: float) -> None:
+    """Заполняет историю синтетическими запусками и замеряет запросы."""
+    rng = random.Random(42)
+    prices = [rng.randint(100, 20_000) for _ in range(skus)]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "history.db")
+        started = time.perf_counter()
+        for _ in range(runs):
+            history = PriceHistory(path, batch_size=10_000)
+            for i in range(skus):
+                if rng.random() < change_rate:
+                    prices[i] = max(1, int(prices[i] * rng.uniform(0.7, 1.2)))
+                history.write(
+                    ProductRecord(
+                        sku=str(1_000_000 + i),
+                        card_price=str(prices[i]),
+                        price=str(prices[i]),
+                        rating="4.7",
+                        reviews="120 отзывов",
+                        salesman=f"Продавец {i % 500}",
+                    )
+                )
+            history.close()
+        elapsed = time.perf_counter() - started
+        observations = skus * runs
+        print(
+            f"Записано наблюдений: {observations} за {elapsed:.1f} с "
+            f"({observations / elapsed:.0f}/с), размер БД "
+            f"{os.path.getsize(path) / 1024**2:.1f} MB"
+        )
+
+        history = PriceHistory(path, start_run=False)
+        rows = history.connection.execute("SELECT COUNT(*) FROM observations").fetchone()[0]
+        print(f"Строк после кодирования серий: {rows}")
+        for title, query in (
+            ("история артикула", lambda: history.history(1_000_000 + skus // 2)),
+            ("падение цены >= 20%", lambda: history.price_drops(20)),
+            ("средние по продавцам", lambda: history.seller_averages()),
+        ):
+            started = time.perf_counter()
+            result = query()
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            print(f"{title}: {len(result)} строк за {elapsed_ms:.1f} мс")
+        history.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Скорость истории цен")
+    parser.add_argument("--skus", type=int, default=100_000)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--change-rate", type=float, default=0.05)
+    args = parser.parse_args()
+    bench(args.skus, args.runs, args.change_rate)
@@ -0,0 +1,80 @@
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from dataclasses import replace
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.sinks import make_record  # noqa: E402
+from utils.run_diff import RunDiff  # noqa: E402
+from utils.sinks import ExcelSink  # noqa: E402
+
+
+def make_runs(size: int, change_rate: float, churn: float) -> tuple[list, list]:
+    """Создаёт два запуска: часть цен меняется, часть товаров уходит и приходит."""
+    rng = random.Random(42)
+    first = [make_record(i) for i in range(size)]
+    second = []
+    for record in first:
+        if rng.random() < churn:
+            continue
+        if rng.random() < change_rate:
+            record = replace(record, price=str(rng.randint(100, 20_000)))
+        second.append(record)
+    second.extend(make_record(size + i) for i in range(int(size * churn)))
+    return first, second
+
+
+def run_diff(tmp: str, runs: list[list]) -> float:
+    """Пишет запуски через RunDiff и возвращает время последнего."""
+    for records in runs:
+        started = time.perf_counter()
+        diff = RunDiff(os.path.join(tmp, "diff.jsonl"), os.path.join(tmp, "state"))
+        for record in records:
+            diff.write(record)
+        diff.close()
+        elapsed = time.perf_counter() - started
+    print(f"  RunDiff: {elapsed:.2f} с, {diff.summary}")
+    return elapsed
+
+
+def merge_workbooks(tmp: str, runs: list[list]) -> float:
+    """Прежний способ: две книги Excel читаются целиком и сливаются."""
+    paths = []
+    for n, records in enumerate(runs):
+        sink = ExcelSink(os.path.join(tmp, f"run{n}.xlsx"))
+        for record in records:
+            sink.write(record)
+        sink.close()
+        paths.append(sink.path)
+    started = time.perf_counter()
+    old, new = (pd.read_excel(path) for path in paths)
+    merged = old.merge(new, on="Артикул", how="outer", indicator=True)
+    changed = merged[
+        (merged["_merge"] == "both") & (merged["Цена_x"] != merged["Цена_y"])
+    ]
+    elapsed = time.perf_counter() - started
+    counts = merged["_merge"].value_counts().to_dict()
+    print(f"  Слияние xlsx: {elapsed:.2f} с, {counts}, изменено цен {len(changed)}")
+    return elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Скорость отчёта об изменениях")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[10_000, 100_000])
+    parser.add_argument("--change-rate", type=float, default=0.05)
+    parser.add_argument("--churn", type=float, default=0.01)
+    parser.add_argument("--skip-xlsx", action="store_true")
+    args = parser.parse_args()
+    for size in args.sizes:
+        print(f"{size} записей:")
+        runs = make_runs(size, args.change_rate, args.churn)
+        with tempfile.TemporaryDirectory() as tmp:
+            run_diff(tmp, runs)
+            if not args.skip_xlsx:
+                merge_workbooks(tmp, runs)
@@ -0,0 +1,87 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.records import ProductRecord  # noqa: E402
+from utils.sinks import SINKS, SqliteSink  # noqa: E402
+
+
+def make_record(i: int) -> ProductRecord:
+    """Создаёт синтетическую запись о товаре."""
+    sku = 1_000_000_000 + i
+    return ProductRecord(
+        sku=str(sku),
+        name=f"Кран шаровой латунный 1/2 дюйма, модель {i}",
+        brand="Valtec",
+        card_price="1 299",
+        discount_price="1 349",
+        price="2 100",
+        rating="4.8",
+        reviews=f"{i % 5000} отзывов",
+        salesman="Сантехника Оптом",
+        seller_href=f"https://www.ozon.ru/seller/santehnika-{i % 300}/",
+        seller_info="ООО САНТЕХНИКА",
+        seller_inn=str(7_700_000_000 + i % 300),
+        url=f"https://www.ozon.ru/product/kran-sharovoy-{sku}/",
+    )
+
+
+def bench(formats: list[str], sizes: list[int]) -> None:
+    """Измеряет скорость записи каждого приёмника."""
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            records = [make_record(i) for i in range(size)]
+            for fmt in formats:
+                sink = SINKS[fmt](os.path.join(tmp, f"bench-{size}.{fmt}"))
+                started = time.perf_counter()
+                for record in records:
+                    sink.write(record)
+                sink.close()
+                elapsed = time.perf_counter() - started
+                size_mb = os.path.getsize(sink.path) / 1024**2
+                print(
+                    f"{fmt:>8} {size:>7} строк: {elapsed:6.2f} с, "
+                    f"{size / elapsed:9.0f} строк/с, {size_mb:6.1f} MB"
+                )
+                if isinstance(sink, SqliteSink):
+                    bench_sqlite_lookups(sink.path, records)
+
+
+def bench_sqlite_lookups(path: str, records: list[ProductRecord]) -> None:
+    """Замеряет повторную запись (обновление по артикулу) и поиск по ИНН."""
+    sink = SqliteSink(path)
+    started = time.perf_counter()
+    for record in records:
+        sink.write(record)
+    sink.flush()
+    elapsed = time.perf_counter() - started
+    total = sink.connection.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+    print(
+        f"{'':>8} повторная запись: {len(records) / elapsed:9.0f} строк/с, "
+        f"строк в таблице {total}"
+    )
+    inns = [record.seller_inn for record in records[:1000]]
+    started = time.perf_counter()
+    found = sum(len(sink.products_by_inn(inn)) for inn in inns)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    print(
+        f"{'':>8} поиск по ИНН: {elapsed_ms / len(inns):.3f} мс на запрос "
+        f"({found / len(inns):.0f} товаров в ответе)"
+    )
+    sink.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Скорость записи приёмников")
+    parser.add_argument(
+        "--formats",
+        nargs="+",
+        default=[fmt for fmt, sink in SINKS.items() if fmt == sink.extension],
+    )
+    parser.add_argument("--sizes", nargs="+", type=int, default=[10_000, 100_000])
+    args = parser.parse_args()
+    bench(args.formats, args.sizes)
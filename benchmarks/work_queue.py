@@ -0,0 +1,87 @@
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.work_queue import WorkQueue, process_queue  # noqa: E402
+
+
+def _fake_fetch(url: str, delay: float) -> dict:
+    """Имитирует загрузку страницы товара браузером."""
+    time.sleep(delay)
+    sku = url.rstrip("/").rsplit("-", 1)[-1]
+    return {"Артикул": sku, "Цена": "1 000 ₽", "Ссылка на товар": url}
+
+
+def _worker(path: str, worker: str, delay: float, lease: float) -> None:
+    queue = WorkQueue(path, lease_seconds=lease)
+    process_queue(
+        queue, worker, fetch=lambda url: _fake_fetch(url, delay), idle_sleep=0.1
+    )
+    queue.close()
+
+
+def _crashing_worker(path: str, lease: float) -> None:
+    """Арендует пачку задач и завершается, не выполнив их."""
+    queue = WorkQueue(path, lease_seconds=lease)
+    queue.lease("crashed", batch_size=10)
+    os._exit(1)
+
+
+def _urls(count: int) -> list[str]:
+    return [f"https://www.ozon.ru/product/tovar-{1_000_000 + i}/" for i in range(count)]
+
+
+def bench(tasks: int, workers: int, delay: float) -> float:
+    """Разбирает очередь несколькими процессами и возвращает задачи в секунду."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "queue.db")
+        WorkQueue(path).enqueue(_urls(tasks))
+        started = time.perf_counter()
+        processes = [
+            multiprocessing.Process(target=_worker, args=(path, f"w{i}", delay, 30.0))
+            for i in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - started
+        done = WorkQueue(path).counts().get("done", 0)
+        return done / elapsed
+
+
+def crash_demo(delay: float, lease: float = 1.0) -> None:
+    """Показывает, что задачи упавшего воркера достаются другому после аренды."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "queue.db")
+        WorkQueue(path).enqueue(_urls(20))
+        crashed = multiprocessing.Process(target=_crashing_worker, args=(path, lease))
+        crashed.start()
+        crashed.join()
+        print(f"После падения воркера: {WorkQueue(path).counts()}")
+        started = time.perf_counter()
+        _worker(path, "survivor", delay, lease)
+        counts = WorkQueue(path).counts()
+        print(
+            f"Выживший воркер завершил очередь за {time.perf_counter() - started:.1f} с: "
+            f"{counts}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Пропускная способность очереди задач")
+    parser.add_argument("--tasks", type=int, default=400)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument(
+        "--delay", type=float, default=0.05, help="Время обработки одной задачи, с"
+    )
+    args = parser.parse_args()
+    for count in args.workers:
+        rate = bench(args.tasks, count, args.delay)
+        print(f"Воркеров {count}: {rate:.1f} задач/с")
+    crash_demo(args.delay)
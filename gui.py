@@ -2,26 +2,43 @@ import sys
 import asyncio
 import logging
 from PyQt5.QtWidgets import QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QTextEdit, QFileDialog
-from PyQt5.QtCore import Qt, QObject
+from PyQt5.QtCore import Qt, QObject, pyqtSignal
 from PyQt5 import QtGui
 import qasync
-from main import main
-from utils.logger import setup_logger
+from utils.logger import LOG_FORMAT, add_log_handler, configure_logging, get_logger
 
-logger = setup_logger(log_file="gui.log")
+logger = get_logger("gui")
+
+
+def run_main(query, max_products, output_file, progress_handler):
+    """
+    Запускает парсер в рабочем потоке. main импортируется здесь, чтобы selenium,
+    pandas и остальной стек загружались при первом запуске, а не до показа окна.
+    """
+    from main import main
+
+    asyncio.run(main(query, max_products, output_file, progress_handler))
+
+
+class LogSignal(QObject):
+    """Передаёт строки лога в поток интерфейса."""
+
+    message = pyqtSignal(str)
 
 
 class StatusOutputHandler(logging.Handler):
-    """Кастомный обработчик логов для вывода сообщений в QTextEdit."""
+    """
+    Кастомный обработчик логов для вывода сообщений в QTextEdit. Вызывается
+    из потока QueueListener, поэтому виджет обновляется через сигнал Qt.
+    """
 
     def __init__(self, text_widget):
         super().__init__()
-        self.text_widget = text_widget
+        self.signal = LogSignal()
+        self.signal.message.connect(text_widget.append)
 
     def emit(self, record):
-        msg = self.format(record)
-        QApplication.processEvents()
-        self.text_widget.append(msg)
+        self.signal.message.emit(self.format(record))
 
 
 class ProgressHandler(QObject):
@@ -50,11 +67,9 @@ class ParserApp(QMainWindow):
         logger.info("Initializing ParserApp")
         try:
             self.initUI()
-            ozon_logger = logging.getLogger("OzonParser")
             status_handler = StatusOutputHandler(self.status_output)
-            status_handler.setFormatter(logging.Formatter(
-                "%(asctime)s - %(levelname)s - %(message)s"))
-            ozon_logger.addHandler(status_handler)
+            status_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+            add_log_handler(status_handler)
             logger.info("ParserApp UI initialized successfully")
         except Exception as e:
             logger.error(
@@ -243,7 +258,10 @@ class ParserApp(QMainWindow):
         logger.info(
             f"Starting parsing with query='{query}', max_products={max_products}, output_file='{output_file}'")
         try:
-            await main(query, max_products, output_file, progress_handler)
+            # Браузер работает в отдельном потоке, чтобы не блокировать интерфейс
+            await asyncio.get_running_loop().run_in_executor(
+                None, run_main, query, max_products, output_file, progress_handler
+            )
             self.status_output.append(
                 f"Парсинг завершён. Файл сохранён: {output_file}")
             logger.info(
@@ -291,6 +309,7 @@ class ParserApp(QMainWindow):
 
 
 if __name__ == "__main__":
+    configure_logging(log_file="gui.log")
     logger.info("Starting QApplication")
     try:
         app = QApplication(sys.argv)
@@ -1,38 +1,99 @@
 # -*- mode: python ; coding: utf-8 -*-
+import os
 
+# Сборка в каталог (быстрый запуск без распаковки во временную папку):
+#   set GUI_ONEDIR=1 && pyinstaller gui.spec
+ONEDIR = os.environ.get("GUI_ONEDIR") == "1"
+
+# Модули, которые не используются приложением, но подтягиваются зависимостями
+EXCLUDES = [
+    'tkinter',
+    'matplotlib',
+    'IPython',
+    'jupyter_client',
+    'notebook',
+    'scipy',
+    'pytest',
+    'pyarrow',
+    'zstandard',
+    'PyQt5.QtWebEngine',
+    'PyQt5.QtWebEngineCore',
+    'PyQt5.QtWebEngineWidgets',
+    'PyQt5.QtMultimedia',
+    'PyQt5.QtQml',
+    'PyQt5.QtQuick',
+    'PyQt5.QtSql',
+    'PyQt5.QtTest',
+    'PyQt5.QtBluetooth',
+    'PyQt5.QtNetwork',
+    'PyQt5.QtDesigner',
+    'pandas.plotting',
+    'pandas.tests',
+    'numpy.tests',
+]
 
 a = Analysis(
     ['gui.py'],
     pathex=[],
     binaries=[],
     datas=[],
-    hiddenimports=[],
+    # main импортируется лениво внутри gui.run_main
+    hiddenimports=['main'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    excludes=EXCLUDES,
     noarchive=False,
     optimize=0,
 )
 pyz = PYZ(a.pure)
 
-exe = EXE(
-    pyz,
-    a.scripts,
-    a.binaries,
-    a.datas,
-    [],
-    name='gui',
-    debug=False,
-    bootloader_ignore_signals=False,
-    strip=False,
-    upx=True,
-    upx_exclude=[],
-    runtime_tmpdir=None,
-    console=False,
-    disable_windowed_traceback=False,
-    argv_emulation=False,
-    target_arch=None,
-    codesign_identity=None,
-    entitlements_file=None,
-)
+if ONEDIR:
+    exe = EXE(
+        pyz,
+        a.scripts,
+        [],
+        exclude_binaries=True,
+        name='gui',
+        debug=False,
+        bootloader_ignore_signals=False,
+        strip=False,
+        # UPX замедляет загрузку библиотек Qt при каждом запуске
+        upx=False,
+        console=False,
+        disable_windowed_traceback=False,
+        argv_emulation=False,
+        target_arch=None,
+        codesign_identity=None,
+        entitlements_file=None,
+    )
+    coll = COLLECT(
+        exe,
+        a.binaries,
+        a.datas,
+        strip=False,
+        upx=False,
+        upx_exclude=[],
+        name='gui',
+    )
+else:
+    exe = EXE(
+        pyz,
+        a.scripts,
+        a.binaries,
+        a.datas,
+        [],
+        name='gui',
+        debug=False,
+        bootloader_ignore_signals=False,
+        strip=False,
+        upx=True,
+        upx_exclude=[],
+        runtime_tmpdir=None,
+        console=False,
+        disable_windowed_traceback=False,
+        argv_emulation=False,
+        target_arch=None,
+        codesign_identity=None,
+        entitlements_file=None,
+    )
@@ -2,40 +2,137 @@ import warnings
 import ssl
 import gc
 import os
+import time
 from contextlib import redirect_stderr
-from utils.logger import setup_logger
-from utils.collect_product_data import collect_data
-from utils.prepare_work import preparation_before_work
+from utils.logger import configure_logging, get_logger
+from utils.collect_product_data import collect_data, collect_listing_data
+from utils.discovery import discover
+from utils.page_archive import PageArchive
+from utils.price_history import PriceHistory
+from utils.product_data import collect_product_info
+from utils.run_diff import RunDiff
+from utils.sinks import ExcelSink, open_sinks
+from utils.prepare_work import preparation_before_work, start_browser
 from utils.scroll import page_down
+from utils.seller_crawl import collect_seller_catalog
+from utils.work_queue import WorkQueue, export_results, process_queue
 
 warnings.filterwarnings("ignore", message="Exception ignored in.*__del__")
 
 ssl._create_default_https_context = ssl._create_unverified_context
 
-logger = setup_logger()
+logger = get_logger("main")
 
 
 async def main(
-    query: str, max_products: int, output_file: str, progress_handler=None
+    query: str,
+    max_products: int,
+    output_file: str,
+    progress_handler=None,
+    archive_dir: str | None = None,
+    listing_only: bool = False,
+    deep_fetch_skus: list[str] | None = None,
+    tabs: int = 1,
+    fragments: bool = False,
+    streaming: bool = False,
+    output_formats: list[str] | None = None,
+    history_db: str | None = None,
+    queue_db: str | None = None,
+    diff_dir: str | None = None,
+    discovery_workers: int = 0,
+    archive_max_age_days: float | None = None,
+    archive_max_bytes: int | None = None,
 ) -> None:
-    """Функция запуска программы."""
+    """
+    Функция запуска программы. archive_max_age_days и archive_max_bytes
+    ограничивают срок хранения и размер архива страниц archive_dir.
+    """
+    if queue_db and tabs > 1:
+        # Задачи очереди арендуются и выполняются по одной в рабочей вкладке
+        raise ValueError("Режим очереди не поддерживает несколько вкладок (tabs)")
+    configure_logging()
+    started = time.perf_counter()
     logger.info(f"Запуск парсера с запросом: {query}")
     driver = None
     original_window = None
     worker_tab = None
+    archive = _open_archive(archive_dir, archive_max_age_days, archive_max_bytes)
     try:
-        logger.info("Инициализация браузера")
-        driver = preparation_before_work(item_name=query)
-        original_window = driver.current_window_handle
-        logger.info("Браузер успешно открыт")
-        products_urls_list = page_down(
-            driver=driver,
-            css_selector="a[href*='/product/']",
-            colvo=max_products,
-            # Уникальный файл для каждого запроса
-            temp_file=f"temp_links_{query.replace(' ', '_')}.txt"
-        )
+        cards = {} if listing_only else None
+        if discovery_workers and not listing_only:
+            # Выдача делится на диапазоны цен и обходится параллельными браузерами.
+            # Основной браузер запускается после: воркеры клонируют базовый
+            # профиль, пока он не занят, а выдача в основном браузере не нужна
+            products_urls_list = discover(
+                query, workers=discovery_workers, max_products=max_products
+            )
+            logger.info("Инициализация браузера")
+            driver = start_browser()
+            original_window = driver.current_window_handle
+        else:
+            logger.info("Инициализация браузера")
+            driver = preparation_before_work(item_name=query)
+            original_window = driver.current_window_handle
+            startup_seconds = time.perf_counter() - started
+            logger.info(
+                f"Браузер успешно открыт, время до выдачи товаров: {startup_seconds:.2f} с",
+                extra={"metrics": {"startup_seconds": startup_seconds}},
+            )
+            products_urls_list = page_down(
+                driver=driver,
+                css_selector="a[href*='/product/']",
+                colvo=max_products,
+                # Уникальный файл для каждого запроса
+                temp_file=f"temp_links_{query.replace(' ', '_')}.txt",
+                cards=cards,
+            )
         logger.info(f"Найдено товаров: {len(products_urls_list)}")
+
+        if listing_only:
+            if deep_fetch_skus:
+                driver.execute_script("window.open('');")
+                worker_tab = driver.window_handles[-1]
+                driver.switch_to.window(worker_tab)
+            collect_listing_data(
+                products_urls=products_urls_list,
+                cards=cards,
+                driver=driver,
+                progress_handler=progress_handler,
+                output_file=output_file,
+                deep_fetch_skus=deep_fetch_skus,
+                archive=archive,
+            )
+            logger.info(f"Excel-файл сохранён: {output_file}")
+            return
+
+        if queue_db:
+            # Ссылки уходят в общую очередь, которую параллельно разбирают worker.py
+            queue = WorkQueue(queue_db)
+            queue.enqueue(products_urls_list)
+            driver.execute_script("window.open('');")
+            worker_tab = driver.window_handles[-1]
+            driver.switch_to.window(worker_tab)
+            process_queue(
+                queue,
+                worker=f"main-{os.getpid()}",
+                fetch=lambda url: collect_product_info(
+                    driver=driver, url=url, archive=archive, fragments=fragments
+                ),
+            )
+            if output_formats:
+                sinks = open_sinks(output_file, output_formats)
+            else:
+                sinks = [ExcelSink(output_file)] if streaming else None
+            export_results(
+                queue,
+                output_file,
+                sinks=sinks,
+                history=PriceHistory(history_db) if history_db else None,
+                diff=_open_diff(output_file, diff_dir),
+            )
+            queue.close()
+            return
+
         products_urls = {
             str(i): url for i, url in enumerate(products_urls_list)
         }
@@ -50,29 +147,144 @@ async def main(
             driver=driver,
             progress_handler=progress_handler,
             output_file=output_file,
+            archive=archive,
+            tabs=tabs,
+            fragments=fragments,
+            streaming=streaming,
+            sinks=open_sinks(output_file, output_formats) if output_formats else None,
+            history=PriceHistory(history_db) if history_db else None,
+            diff=_open_diff(output_file, diff_dir),
         )
         logger.info(f"Excel-файл сохранён: {output_file}")
     except Exception as e:
         logger.error(f"Ошибка в main: {e}")
         raise
     finally:
+        if archive is not None:
+            archive.close()
+        if driver is not None:
+            _close_browser(driver, worker_tab, original_window)
+            with open(os.devnull, "w") as devnull:
+                with redirect_stderr(devnull):
+                    del driver
+                    gc.collect()
+
+
+async def crawl_sellers(
+    seller_urls: list[str],
+    max_products: int,
+    output_file: str,
+    progress_handler=None,
+    archive_dir: str | None = None,
+    tabs: int = 1,
+    fragments: bool = False,
+    streaming: bool = False,
+    output_formats: list[str] | None = None,
+    history_db: str | None = None,
+    diff_dir: str | None = None,
+    archive_max_age_days: float | None = None,
+    archive_max_bytes: int | None = None,
+) -> None:
+    """
+    Собирает все товары заданных продавцов: данные продавца запрашиваются
+    один раз, ссылки на товары берутся с витрины продавца. Ограничения
+    архива страниц — как в main.
+    """
+    configure_logging()
+    logger.info(f"Запуск обхода витрин продавцов: {len(seller_urls)}")
+    driver = None
+    original_window = None
+    worker_tab = None
+    archive = _open_archive(archive_dir, archive_max_age_days, archive_max_bytes)
+    try:
+        driver = start_browser()
+        original_window = driver.current_window_handle
+        products_urls: dict[str, str] = {}
+        known_sellers: dict[str, tuple] = {}
+        for seller_url in seller_urls:
+            seller, urls = collect_seller_catalog(
+                driver,
+                seller_url,
+                max_products=max_products,
+                archive=archive,
+                fragments=fragments,
+            )
+            for url in urls:
+                if url not in known_sellers:
+                    products_urls[str(len(products_urls))] = url
+                    known_sellers[url] = seller
+        # Поиск открывает страницу товара и страницу продавца на каждый товар
+        page_loads = len(products_urls) + 2 * len(seller_urls)
+        logger.info(
+            f"Найдено товаров у продавцов: {len(products_urls)}, загрузок страниц "
+            f"{page_loads} вместо {2 * len(products_urls)} при сборе через поиск",
+            extra={"metrics": {"products": len(products_urls), "page_loads": page_loads}},
+        )
+
+        driver.execute_script("window.open('');")
+        worker_tab = driver.window_handles[-1]
+        driver.switch_to.window(worker_tab)
+        collect_data(
+            products_urls=products_urls,
+            driver=driver,
+            progress_handler=progress_handler,
+            output_file=output_file,
+            archive=archive,
+            tabs=tabs,
+            fragments=fragments,
+            streaming=streaming,
+            sinks=open_sinks(output_file, output_formats) if output_formats else None,
+            history=PriceHistory(history_db) if history_db else None,
+            diff=_open_diff(output_file, diff_dir),
+            known_sellers=known_sellers,
+        )
+        logger.info(f"Файл сохранён: {output_file}")
+    except Exception as e:
+        logger.error(f"Ошибка при обходе продавцов: {e}")
+        raise
+    finally:
+        if archive is not None:
+            archive.close()
         if driver is not None:
-            try:
-                if worker_tab and worker_tab in driver.window_handles:
-                    driver.switch_to.window(worker_tab)
-                    driver.close()
-                if original_window and original_window in driver.window_handles:
-                    driver.switch_to.window(original_window)
-                logger.info("Закрытие браузера")
-                driver.quit()
-            except Exception:
-                pass
+            _close_browser(driver, worker_tab, original_window)
             with open(os.devnull, "w") as devnull:
                 with redirect_stderr(devnull):
                     del driver
                     gc.collect()
 
 
+def _open_archive(
+    archive_dir: str | None,
+    max_age_days: float | None,
+    max_bytes: int | None,
+) -> PageArchive | None:
+    """Создаёт архив страниц с ограничениями хранения."""
+    if not archive_dir:
+        return None
+    return PageArchive(root=archive_dir, max_age_days=max_age_days, max_bytes=max_bytes)
+
+
+def _open_diff(output_file: str, diff_dir: str | None) -> RunDiff | None:
+    """Создаёт отчёт об изменениях рядом с выходным файлом."""
+    if not diff_dir:
+        return None
+    return RunDiff(f"{os.path.splitext(output_file)[0]}.diff.jsonl", state_dir=diff_dir)
+
+
+def _close_browser(driver, worker_tab, original_window) -> None:
+    """Закрывает рабочую вкладку и браузер."""
+    try:
+        if worker_tab and worker_tab in driver.window_handles:
+            driver.switch_to.window(worker_tab)
+            driver.close()
+        if original_window and original_window in driver.window_handles:
+            driver.switch_to.window(original_window)
+        logger.info("Закрытие браузера")
+        driver.quit()
+    except Exception:
+        pass
+
+
 if __name__ == "__main__":
     import asyncio
 
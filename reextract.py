@@ -0,0 +1,187 @@
+import argparse
+import gzip
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, Optional
+from utils.logger import configure_logging, configure_worker_logging, get_logger
+from utils.load_in_excel import write_data_to_excel
+from utils.page_archive import INDEX_FILE, PageArchive
+from utils.product_data import extract_product_record
+from utils.records import ProductRecord
+from utils.sinks import open_sinks
+
+logger = get_logger("reextract")
+
+# Задача: (ссылка на товар, источник страницы товара, источник страницы продавца).
+# Источник — ("archive", корень архива, sha256) или ("file", путь, None).
+Source = tuple[str, str, Optional[str]]
+Task = tuple[str, Source, Optional[Source]]
+
+
+def _read_source(source: Source) -> str:
+    """Читает HTML страницы из архива или из файла."""
+    kind, path, digest = source
+    if kind == "archive":
+        return PageArchive(root=path).load(digest)
+    if path.endswith(".gz"):
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return f.read()
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def _archive_tasks(root: str) -> Iterator[Task]:
+    """Формирует задачи по индексу архива, беря последнюю версию каждой страницы."""
+    products: dict[str, dict] = {}
+    sellers: dict[str, dict] = {}
+    for entry in PageArchive(root=root).entries():
+        if entry["kind"] == "seller":
+            if entry.get("product_id"):
+                sellers[entry["product_id"]] = entry
+        else:
+            products[entry.get("product_id") or entry["url"]] = entry
+    for key, entry in products.items():
+        seller_entry = sellers.get(key)
+        seller_source = (
+            ("archive", root, seller_entry["sha256"]) if seller_entry else None
+        )
+        yield entry["url"], ("archive", root, entry["sha256"]), seller_source
+
+
+def _directory_tasks(root: str) -> Iterator[Task]:
+    """
+    Формирует задачи по каталогу с файлами *.html и *.html.gz; страница продавца
+    ищется рядом с файлом товара под именем <имя>.seller.html.
+    """
+    for dirpath, _, filenames in os.walk(root):
+        names = set(filenames)
+        for filename in sorted(filenames):
+            for ext in (".html", ".html.gz"):
+                if filename.endswith(ext) and not filename.endswith(".seller" + ext):
+                    stem = filename[: -len(ext)]
+                    break
+            else:
+                continue
+            path = os.path.join(dirpath, filename)
+            seller_source = None
+            for seller_ext in (".seller.html", ".seller.html.gz"):
+                if stem + seller_ext in names:
+                    seller_path = os.path.join(dirpath, stem + seller_ext)
+                    seller_source = ("file", seller_path, None)
+                    break
+            yield path, ("file", path, None), seller_source
+
+
+def _init_worker() -> None:
+    """Снижает подробность логов в дочерних процессах."""
+    configure_worker_logging()
+
+
+def _extract_chunk(tasks: list[Task]) -> tuple[int, float, list[dict]]:
+    """Извлекает записи о товарах для пачки страниц в дочернем процессе."""
+    started = time.perf_counter()
+    records = []
+    for url, product_source, seller_source in tasks:
+        try:
+            product_html = _read_source(product_source)
+            seller_html = _read_source(seller_source) if seller_source else None
+            records.append(extract_product_record(product_html, url, seller_html))
+        except Exception as e:
+            logger.warning(f"Ошибка при повторном извлечении {url}: {str(e)}")
+    return os.getpid(), time.perf_counter() - started, records
+
+
+def _chunks(tasks: list[Task], size: int) -> Iterator[list[Task]]:
+    """Делит список задач на пачки для дочерних процессов."""
+    for start in range(0, len(tasks), size):
+        yield tasks[start : start + size]
+
+
+def reextract(
+    source: str,
+    output_file: str = "ozon_products.xlsx",
+    workers: Optional[int] = None,
+    chunk_size: int = 64,
+    output_formats: Optional[list[str]] = None,
+) -> dict[str, ProductRecord]:
+    """Повторно извлекает данные о товарах из сохранённых страниц на всех ядрах."""
+    if os.path.exists(os.path.join(source, INDEX_FILE)):
+        tasks = list(_archive_tasks(source))
+    else:
+        tasks = list(_directory_tasks(source))
+    workers = workers or os.cpu_count() or 1
+    logger.info(
+        f"Повторное извлечение: {len(tasks)} страниц, процессов: {workers}, "
+        f"размер пачки: {chunk_size}"
+    )
+
+    products_data: dict[str, ProductRecord] = {}
+    worker_stats: dict[int, list[float]] = {}
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        for pid, elapsed, records in pool.map(
+            _extract_chunk, _chunks(tasks, chunk_size)
+        ):
+            stats = worker_stats.setdefault(pid, [0, 0.0])
+            stats[0] += len(records)
+            stats[1] += elapsed
+            for record in records:
+                product_id = record.get("Артикул")
+                if product_id is not None and product_id not in products_data:
+                    products_data[product_id] = ProductRecord.from_dict(record)
+    total_elapsed = time.perf_counter() - started
+
+    for pid, (pages, busy) in sorted(worker_stats.items()):
+        rate = pages / busy if busy else 0.0
+        logger.info(f"Процесс {pid}: {pages} страниц, {rate:.1f} стр/с")
+    total_rate = len(tasks) / total_elapsed if total_elapsed else 0.0
+    logger.info(
+        f"Обработано {len(tasks)} страниц за {total_elapsed:.1f} с "
+        f"({total_rate:.1f} стр/с), записей с артикулом: {len(products_data)}",
+        extra={
+            "metrics": {
+                "pages": len(tasks),
+                "seconds": total_elapsed,
+                "pages_per_second": total_rate,
+                "workers": len(worker_stats),
+            }
+        },
+    )
+
+    if output_formats:
+        for sink in open_sinks(output_file, output_formats):
+            for record in products_data.values():
+                sink.write(record)
+            sink.close()
+    else:
+        write_data_to_excel(products_data=products_data, filename=output_file)
+        logger.info(f"Excel-файл сохранён: {output_file}")
+    return products_data
+
+
+if __name__ == "__main__":
+    configure_logging()
+    parser = argparse.ArgumentParser(
+        description="Повторное извлечение данных из сохранённых страниц Ozon"
+    )
+    parser.add_argument("source", help="Каталог архива страниц или HTML-файлов")
+    parser.add_argument("-o", "--output", default="ozon_products.xlsx")
+    parser.add_argument("-w", "--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=64)
+    parser.add_argument(
+        "-f",
+        "--format",
+        nargs="+",
+        dest="formats",
+        help="Форматы вывода: xlsx, csv, jsonl, parquet, db",
+    )
+    args = parser.parse_args()
+
+    reextract(
+        source=args.source,
+        output_file=args.output,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        output_formats=args.formats,
+    )
@@ -1,11 +1,31 @@
 from selenium.webdriver.chrome.webdriver import WebDriver
-from utils.product_data import collect_product_info
+from itertools import chain
+from typing import Callable, Iterable, Iterator
+from utils.multi_tab import fetch_pages_in_tabs
+from utils.product_data import (
+    card_to_record,
+    collect_product_info,
+    collect_product_info_from_page,
+    log_page_stats,
+    reset_page_stats,
+)
 from utils.load_in_excel import write_data_to_excel
-from utils.logger import setup_logger
+from utils.logger import get_logger
+from utils.page_archive import PageArchive
+from utils.price_history import PriceHistory
+from utils.records import ProductRecord, sku_to_int
+from utils.retry_queue import FetchError, RetryQueue
+from utils.run_diff import RunDiff
+from utils.sinks import ExcelSink, Sink
+from utils.streaming import peak_rss_mb
 import gc
+import os
 import psutil
 
-logger = setup_logger()
+logger = get_logger(__name__)
+
+# Ожидание страницы в основном проходе; повторы ждут дольше
+FIRST_PASS_TIMEOUT = 10.0
 
 
 def collect_data(
@@ -13,38 +33,270 @@ def collect_data(
     driver: WebDriver,
     progress_handler=None,
     output_file: str = "ozon_products.xlsx",
+    archive: PageArchive | None = None,
+    tabs: int = 1,
+    fragments: bool = False,
+    streaming: bool = False,
+    sinks: list[Sink] | None = None,
+    history: PriceHistory | None = None,
+    known_sellers: dict[str, tuple[str, str, str]] | None = None,
+    diff: RunDiff | None = None,
+    retries: RetryQueue | None = None,
 ) -> None:
-    """Функция сбора данных."""
-    products_data = {}
+    """
+    Функция сбора данных. При tabs > 1 страницы товаров загружаются
+    одновременно в нескольких вкладках одного браузера, при fragments
+    из браузера забираются только нужные виджеты вместо всего page_source.
+    Если заданы sinks (или streaming, что равно одному ExcelSink), записи
+    сразу передаются приёмникам и не держатся в памяти; дубли отсекаются
+    по множеству целочисленных артикулов. history дополнительно пишет цены,
+    рейтинг и отзывы каждого товара в локальную историю цен. known_sellers
+    сопоставляет ссылке на товар уже полученные данные продавца, и страница
+    продавца для таких товаров не открывается. diff в конце запуска пишет
+    отчёт об изменениях относительно предыдущего запуска. Неудачные ссылки
+    не повторяются на месте, а откладываются в retries и дорабатываются позже;
+    оставшиеся неудачи пишутся в <output_file>.failures.jsonl.
+    """
+    known_sellers = known_sellers or {}
+    reset_page_stats()
+    products_data: dict[str, ProductRecord] = {}
+    if sinks is None and streaming:
+        sinks = [ExcelSink(output_file)]
+    seen_skus: set[int] = set()
     if progress_handler:
         progress_handler.set_total(len(products_urls))
     processed_count = 0
 
-    for url in products_urls.values():
-        processed_count += 1
-        logger.info(f"Обработка товара {processed_count}")
-        # Логирование использования памяти
+    if retries is None:
+        retries = RetryQueue()
+
+    def fetch(url: str, timeout: float = 25.0) -> dict[str, str | None]:
+        return collect_product_info(
+            driver=driver,
+            url=url,
+            archive=archive,
+            fragments=fragments,
+            seller=known_sellers.get(url),
+            timeout=timeout,
+        )
+
+    if tabs > 1:
+        main_pass = _collect_in_tabs(
+            products_urls.values(),
+            driver,
+            tabs,
+            retries,
+            archive,
+            fragments,
+            known_sellers,
+        )
+    else:
+        main_pass = _collect_sequential(products_urls.values(), retries, fetch)
+    # Отложенные ссылки дорабатываются после основного прохода
+    results = chain(main_pass, _drain_retries(retries, fetch))
+
+    try:
+        for data in results:
+            processed_count += 1
+            logger.info(f"Обработка товара {processed_count}")
+            # Логирование использования памяти
+            try:
+                memory_info = psutil.virtual_memory()
+                logger.debug(
+                    f"Использование памяти: {memory_info.percent}% ({memory_info.used / 1024**2:.2f} MB)"
+                )
+            except Exception as e:
+                logger.warning(f"Ошибка при мониторинге памяти: {str(e)}")
+            product_id = data.get("Артикул")
+            if product_id is None:
+                # Ссылка без записи (попытки исчерпаны) тоже засчитывается в прогресс
+                if progress_handler:
+                    progress_handler.update()
+                continue
+            if sinks is not None:
+                sku = sku_to_int(product_id)
+                if sku not in seen_skus:
+                    if sku is not None:
+                        seen_skus.add(sku)
+                    record = ProductRecord.from_dict(data)
+                    for sink in sinks:
+                        sink.write(record)
+            elif product_id not in products_data:
+                products_data[product_id] = ProductRecord.from_dict(data)
+            if history is not None or diff is not None:
+                record = ProductRecord.from_dict(data)
+                if history is not None:
+                    history.write(record)
+                if diff is not None:
+                    diff.write(record)
+            data = None
+            if progress_handler:
+                progress_handler.update()
+
+            if sinks is None and processed_count % 2 == 0:
+                write_data_to_excel(products_data=products_data, filename=output_file)
+                gc.collect()  # Принудительная сборка мусора
+                logger.debug("Очистка памяти после записи в Excel")
+    finally:
+        # Выводы закрываются и при прерванном проходе, чтобы собранное не пропало
+        _close_outputs(sinks, products_data, output_file, history, diff)
+        retries.write_report(f"{os.path.splitext(output_file)[0]}.failures.jsonl")
+        log_page_stats()
+
+
+def _close_outputs(
+    sinks: list[Sink] | None,
+    products_data: dict[str, ProductRecord],
+    output_file: str,
+    history: PriceHistory | None,
+    diff: RunDiff | None,
+) -> None:
+    """Закрывает приёмники, историю цен и отчёт об изменениях; ошибки логируются."""
+    if sinks is not None:
+        for sink in sinks:
+            try:
+                sink.close()
+            except Exception as e:
+                logger.error(f"Ошибка при закрытии вывода {sink.path}: {str(e)}")
+        peak = peak_rss_mb()
+        if peak is not None:
+            logger.info(f"Пиковое потребление памяти: {peak:.1f} MB")
+    elif products_data:
+        write_data_to_excel(products_data=products_data, filename=output_file)
+        gc.collect()  # Финальная очистка памяти
+    for output in (history, diff):
+        if output is None:
+            continue
         try:
-            memory_info = psutil.virtual_memory()
-            logger.debug(
-                f"Использование памяти: {memory_info.percent}% ({memory_info.used / 1024**2:.2f} MB)"
-            )
+            output.close()
         except Exception as e:
-            logger.warning(f"Ошибка при мониторинге памяти: {str(e)}")
-        data = collect_product_info(driver=driver, url=url)
-        product_id = data.get("Артикул")
-        if product_id is None:
+            logger.error(f"Ошибка при закрытии вывода {output.path}: {str(e)}")
+
+
+def _attempt(
+    retries: RetryQueue, url: str, fetch: Callable[[str], dict[str, str | None]]
+) -> dict[str, str | None] | None:
+    """
+    Выполняет одну попытку; при ошибке ссылка откладывается в retries и
+    возвращается None. После последней попытки возвращается частичная запись
+    или пустой словарь, чтобы ссылка была учтена в прогрессе.
+    """
+    try:
+        data = fetch(url)
+    except FetchError as e:
+        exhausted = retries.defer(url, e)
+        return (e.record or {}) if exhausted else None
+    retries.resolve(url)
+    return data
+
+
+def _collect_sequential(
+    urls: Iterable[str],
+    retries: RetryQueue,
+    fetch: Callable[..., dict[str, str | None]],
+) -> Iterator[dict[str, str | None]]:
+    """
+    Основной проход по ссылкам в одной вкладке. Ожидание страницы сокращено
+    до FIRST_PASS_TIMEOUT, а подошедшие по времени повторы выполняются между
+    товарами, не задерживая проход.
+    """
+    for url in urls:
+        data = _attempt(retries, url, lambda u: fetch(u, FIRST_PASS_TIMEOUT))
+        if data is not None:
+            yield data
+        for retry_url in retries.due():
+            data = _attempt(retries, retry_url, fetch)
+            if data is not None:
+                yield data
+
+
+def _drain_retries(
+    retries: RetryQueue, fetch: Callable[[str], dict[str, str | None]]
+) -> Iterator[dict[str, str | None]]:
+    """Дорабатывает отложенные ссылки, пока у них остаются попытки."""
+    if len(retries):
+        logger.info(f"Повтор отложенных ссылок: {len(retries)}")
+    for url in retries.drain():
+        data = _attempt(retries, url, fetch)
+        if data is not None:
+            yield data
+
+
+def _collect_in_tabs(
+    urls: Iterable[str],
+    driver: WebDriver,
+    tabs: int,
+    retries: RetryQueue,
+    archive: PageArchive | None = None,
+    fragments: bool = False,
+    known_sellers: dict[str, tuple[str, str, str]] | None = None,
+) -> Iterator[dict[str, str | None]]:
+    """
+    Собирает товары, загружая страницы в нескольких вкладках параллельно.
+    Страницы товаров забираются целиком, fragments влияет на страницы продавцов.
+    Неудачные ссылки откладываются в retries.
+    """
+    # Данные продавцов запрашиваются во вкладке, открытой до вызова
+    seller_tab = driver.current_window_handle
+    for url, page_source, _ in fetch_pages_in_tabs(driver, urls, tabs=tabs):
+        if page_source is None:
+            error = FetchError("timeout", "Страница не загрузилась во вкладке")
+            if retries.defer(url, error):
+                yield {}
             continue
+        driver.switch_to.window(seller_tab)
+        data = _attempt(
+            retries,
+            url,
+            lambda u: collect_product_info_from_page(
+                driver=driver,
+                url=u,
+                page_source=page_source,
+                archive=archive,
+                fragments=fragments,
+                seller=(known_sellers or {}).get(u),
+            ),
+        )
+        if data is not None:
+            yield data
+
+
+def collect_listing_data(
+    products_urls: list[str],
+    cards: dict[str, dict],
+    driver: WebDriver | None = None,
+    progress_handler=None,
+    output_file: str = "ozon_products.xlsx",
+    deep_fetch_skus: Iterable[str] | None = None,
+    archive: PageArchive | None = None,
+) -> None:
+    """
+    Записывает данные из карточек поисковой выдачи без открытия страниц товаров.
+    Товары из deep_fetch_skus дополнительно собираются полностью.
+    """
+    products_data = {}
+    for url in products_urls:
+        data = card_to_record(url, cards.get(url, {}))
+        product_id = data.get("Артикул") or url
         if product_id not in products_data:
-            products_data[product_id] = data
-        if progress_handler:
-            progress_handler.update()
+            products_data[product_id] = ProductRecord.from_dict(data)
+    logger.info(f"Собрано товаров из выдачи: {len(products_data)}")
 
-        if processed_count % 2 == 0:
-            write_data_to_excel(products_data=products_data, filename=output_file)
-            gc.collect()  # Принудительная сборка мусора
-            logger.debug("Очистка памяти после записи в Excel")
+    deep_fetch_skus = [sku for sku in deep_fetch_skus or () if sku in products_data]
+    if deep_fetch_skus and driver is not None:
+        if progress_handler:
+            progress_handler.set_total(len(deep_fetch_skus))
+        for sku in deep_fetch_skus:
+            url = products_data[sku].url
+            try:
+                data = collect_product_info(driver=driver, url=url, archive=archive)
+            except FetchError as e:
+                # Остаётся запись из карточки выдачи, если нет даже частичной
+                logger.warning(f"Товар не собран полностью ({e.kind}): {url}")
+                data = e.record or {}
+            if data.get("Артикул") is not None:
+                products_data[sku] = ProductRecord.from_dict(data)
+            if progress_handler:
+                progress_handler.update()
 
-    if products_data:
-        write_data_to_excel(products_data=products_data, filename=output_file)
-        gc.collect()  # Финальная очистка памяти
+    write_data_to_excel(products_data=products_data, filename=output_file)
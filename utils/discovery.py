@@ -0,0 +1,181 @@
+import math
+import multiprocessing
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from multiprocessing.util import Finalize
+from typing import Optional
+from urllib.parse import quote_plus
+from selenium.webdriver.chrome.webdriver import WebDriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+from utils.logger import configure_worker_logging, get_logger
+from utils.prepare_work import PRODUCT_LINK_SELECTOR, SEARCH_URL, start_browser
+from utils.records import sku_from_url
+from utils.scroll import page_down
+
+logger = get_logger(__name__)
+
+# Верхняя граница цены для корневого сегмента, в копейках
+MAX_PRICE = 100_000_000_00
+
+# Количество найденных товаров из заголовка выдачи, например «Найдено 12 345 товаров»
+RESULT_COUNT_JS = r"""
+const header = document.querySelector(
+    "[data-widget='fulltextResultsHeader'], [data-widget='searchResultsHeader']"
+);
+const text = header ? header.innerText : '';
+const match = text.match(/(\d[\d\s]*)\s*товар/);
+return match ? match[1].replace(/\D/g, '') : null;
+"""
+
+# Браузер процесса-воркера, запускается один раз в _init_worker
+_driver: Optional[WebDriver] = None
+
+
+@dataclass(slots=True)
+class Shard:
+    """Диапазон цен [low, high] в копейках, на который сужается поисковый запрос."""
+
+    low: int = 0
+    high: int = MAX_PRICE
+
+    def url(self, query: str) -> str:
+        """Возвращает ссылку на выдачу с фильтром по цене."""
+        price = f"{self.low / 100:.3f};{self.high / 100:.3f}"
+        return f"{SEARCH_URL.format(query=quote_plus(query))}&currency_price={price}"
+
+    def split(self) -> Optional[tuple["Shard", "Shard"]]:
+        """
+        Делит диапазон по среднему геометрическому: цены в выдаче распределены
+        ближе к логнормальному, чем к равномерному. Границы не пересекаются.
+        """
+        if self.high - self.low < 2:
+            return None
+        middle = int(math.sqrt(max(self.low, 100) * self.high))
+        middle = min(max(middle, self.low), self.high - 1)
+        return Shard(self.low, middle), Shard(middle + 1, self.high)
+
+
+def result_count(driver: WebDriver) -> Optional[int]:
+    """Возвращает число товаров из заголовка выдачи, если оно показано."""
+    try:
+        count = driver.execute_script(RESULT_COUNT_JS)
+    except Exception as e:
+        logger.debug(f"Не удалось прочитать число товаров: {str(e)}")
+        return None
+    return int(count) if count else None
+
+
+def scan_shard(
+    driver: WebDriver, query: str, shard: Shard, limit: int, timeout: float = 15.0
+) -> tuple[list[str], Optional[int]]:
+    """
+    Открывает выдачу сегмента и прокручивает её. Если по заголовку видно, что
+    товаров больше limit, прокрутка пропускается: сегмент всё равно будет разделён.
+    """
+    driver.get(shard.url(query))
+    try:
+        WebDriverWait(driver, timeout).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, PRODUCT_LINK_SELECTOR))
+        )
+    except TimeoutException:
+        return [], 0
+    count = result_count(driver)
+    if count is not None and count > limit and shard.split() is not None:
+        return [], count
+    links = page_down(
+        driver=driver,
+        css_selector=PRODUCT_LINK_SELECTOR,
+        colvo=limit,
+        temp_file=f"temp_links_{query.replace(' ', '_')}_{shard.low}_{shard.high}.txt",
+    )
+    return links, count
+
+
+def _init_worker(worker_ids) -> None:
+    """Запускает в процессе браузер с собственным клоном профиля."""
+    global _driver
+    configure_worker_logging()
+    _driver = start_browser(worker=worker_ids.get())
+    Finalize(_driver, _driver.quit, exitpriority=10)
+
+
+def _scan_in_worker(query: str, shard: Shard, limit: int):
+    links, count = scan_shard(_driver, query, shard, limit)
+    return shard, links, count
+
+
+def discover(
+    query: str,
+    workers: int = 4,
+    shard_limit: int = 1000,
+    max_products: int = 0,
+) -> list[str]:
+    """
+    Собирает ссылки на товары по запросу, разбивая выдачу на непересекающиеся
+    диапазоны цен. Сегменты, в которых товаров больше shard_limit, делятся
+    пополам и досканируются; сегменты обрабатываются параллельно в отдельных
+    браузерах. Ссылки объединяются без повторов по артикулу.
+    """
+    started = time.perf_counter()
+    found: dict[int, str] = {}
+    stats = {"shards": 0, "splits": 0, "duplicates": 0, "reported": None}
+    manager = multiprocessing.Manager()
+    worker_ids = manager.Queue()
+    for worker in range(workers):
+        worker_ids.put(worker)
+
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(worker_ids,)
+    ) as pool:
+        pending = {pool.submit(_scan_in_worker, query, Shard(), shard_limit)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    shard, links, count = future.result()
+                except Exception as e:
+                    logger.warning(f"Ошибка при обходе сегмента выдачи: {str(e)}")
+                    continue
+                stats["shards"] += 1
+                if shard.low == 0 and shard.high == MAX_PRICE:
+                    stats["reported"] = count
+                for url in links:
+                    sku = sku_from_url(url)
+                    if sku is None:
+                        continue
+                    if sku in found:
+                        stats["duplicates"] += 1
+                    else:
+                        found[sku] = url
+                saturated = (count or 0) > shard_limit or len(links) >= shard_limit
+                halves = shard.split() if saturated else None
+                if halves:
+                    stats["splits"] += 1
+                    pending |= {
+                        pool.submit(_scan_in_worker, query, half, shard_limit)
+                        for half in halves
+                    }
+                logger.info(
+                    f"Сегмент {shard.low / 100:.0f}–{shard.high / 100:.0f} ₽: "
+                    f"ссылок {len(links)}, по заголовку {count}, "
+                    f"всего товаров {len(found)}"
+                )
+            if max_products and len(found) >= max_products:
+                for future in pending:
+                    future.cancel()
+                break
+    manager.shutdown()
+
+    elapsed = time.perf_counter() - started
+    logger.info(
+        f"Поиск по сегментам: товаров {len(found)} (в выдаче {stats['reported']}), "
+        f"сегментов {stats['shards']}, делений {stats['splits']}, "
+        f"повторов {stats['duplicates']}, {elapsed:.1f} с",
+        extra={"metrics": {**stats, "products": len(found), "seconds": elapsed}},
+    )
+    urls = list(found.values())
+    return urls[:max_products] if max_products else urls
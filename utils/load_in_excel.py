@@ -1,20 +1,27 @@
 import pandas as pd
 from openpyxl.styles import Alignment, Font
 from openpyxl.utils import get_column_letter
-from utils.logger import setup_logger
+from utils.logger import get_logger
+from utils.records import (
+    EXCEL_PRICE_FORMAT,
+    PRICE_COLUMNS,
+    ProductRecord,
+    prices_to_rubles,
+    records_to_frame,
+)
 
-logger = setup_logger()
+logger = get_logger(__name__)
 
 
 def write_data_to_excel(
-    products_data: dict[str, dict[str, str | None]],
+    products_data: dict[str, ProductRecord],
     filename: str = "products.xlsx",
 ) -> None:
-    """Записывает данные о продуктах в Excel-файл."""
+    """Записывает данные о продуктах в Excel-файл; цены записываются в рублях."""
     if not products_data:
         return
 
-    df = pd.DataFrame.from_dict(products_data, orient="index")
+    df = prices_to_rubles(records_to_frame(products_data.values()))
     with pd.ExcelWriter(filename, engine="openpyxl") as writer:
         df.to_excel(writer, sheet_name="Products", index=False)
         worksheet = writer.sheets["Products"]
@@ -30,3 +37,8 @@ def write_data_to_excel(
         for cell in worksheet[1]:
             cell.font = Font(bold=True)
             cell.alignment = Alignment(horizontal="center")
+
+        for column in PRICE_COLUMNS:
+            letter = get_column_letter(df.columns.get_loc(column) + 1)
+            for cell in worksheet[letter][1:]:
+                cell.number_format = EXCEL_PRICE_FORMAT
@@ -1,22 +1,136 @@
+import atexit
+import json
 import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Optional
 
+ROOT_LOGGER = "OzonParser"
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+_listener: Optional[QueueListener] = None
+_handlers: list[logging.Handler] = []
+
+
+class JsonFormatter(logging.Formatter):
+    """Форматирует записи лога в одну строку JSON для разбора метрик."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": record.created,
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        # Числовые показатели передаются через logger.info(..., extra={"metrics": {...}})
+        metrics = getattr(record, "metrics", None)
+        if metrics:
+            data["metrics"] = metrics
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False)
 
-def setup_logger(log_file: str = "parser.log") -> logging.Logger:
-    """Настраивает логгер для записи в файл и консоль."""
-    logger = logging.getLogger("OzonParser")
-    logger.setLevel(logging.INFO)
-    logger.handlers.clear()
 
-    formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
+def get_logger(name: Optional[str] = None) -> logging.Logger:
+    """Возвращает логгер модуля; настройка выполняется один раз в configure_logging."""
+    if not name:
+        return logging.getLogger(ROOT_LOGGER)
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
 
-    file_handler = logging.FileHandler(log_file, mode="w", encoding="utf-8")
-    file_handler.setLevel(logging.INFO)
+
+def configure_logging(
+    log_file: str = "parser.log",
+    level: int = logging.INFO,
+    module_levels: Optional[dict[str, int]] = None,
+    json_log_file: Optional[str] = None,
+    max_bytes: int = 10 * 1024**2,
+    backup_count: int = 3,
+    console: bool = True,
+) -> logging.Logger:
+    """
+    Настраивает логирование один раз за процесс: модули пишут в очередь, а
+    форматирование и вывод в файл и консоль выполняет отдельный поток
+    QueueListener. Повторные вызовы ничего не меняют.
+    """
+    global _listener
+    logger = logging.getLogger(ROOT_LOGGER)
+    if _listener is not None:
+        return logger
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    file_handler = RotatingFileHandler(
+        log_file, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+    )
     file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
+    _handlers.append(file_handler)
 
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.INFO)
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+    if console:
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(formatter)
+        _handlers.append(console_handler)
 
+    if json_log_file:
+        json_handler = RotatingFileHandler(
+            json_log_file,
+            maxBytes=max_bytes,
+            backupCount=backup_count,
+            encoding="utf-8",
+        )
+        json_handler.setFormatter(JsonFormatter())
+        _handlers.append(json_handler)
+
+    log_queue: queue.Queue = queue.Queue(-1)
+    logger.handlers.clear()
+    logger.addHandler(QueueHandler(log_queue))
+    logger.setLevel(level)
+    logger.propagate = False
+    for name, module_level in (module_levels or {}).items():
+        get_logger(name).setLevel(module_level)
+
+    _listener = QueueListener(log_queue, *_handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
     return logger
+
+
+def add_log_handler(handler: logging.Handler) -> None:
+    """Подключает дополнительный обработчик к потоку вывода логов."""
+    global _listener
+    if _listener is None:
+        configure_logging()
+    _listener.stop()
+    _handlers.append(handler)
+    _listener = QueueListener(
+        _listener.queue, *_handlers, respect_handler_level=True
+    )
+    _listener.start()
+
+
+def configure_worker_logging(level: int = logging.WARNING) -> None:
+    """
+    Настраивает логирование в дочернем процессе: поток QueueListener после
+    fork не наследуется, поэтому записи выводятся в консоль напрямую.
+    """
+    global _listener
+    _listener = None
+    _handlers.clear()
+    logger = logging.getLogger(ROOT_LOGGER)
+    logger.handlers.clear()
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    logger.addHandler(handler)
+    logger.setLevel(level)
+    logger.propagate = False
+
+
+def shutdown_logging() -> None:
+    """Дописывает оставшиеся в очереди записи и останавливает поток вывода."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    for handler in _handlers:
+        handler.close()
+    _handlers.clear()
+    logging.getLogger(ROOT_LOGGER).handlers.clear()
@@ -0,0 +1,131 @@
+import time
+from typing import Iterable, Iterator, Optional
+from selenium.webdriver.chrome.webdriver import WebDriver
+from selenium.common.exceptions import WebDriverException
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Страница товара считается загруженной, когда документ новый (timeOrigin
+# позже, чем у документа до перехода), готов и на нём отрисована ссылка на
+# продавца (её же ждёт collect_product_info). Без проверки timeOrigin вкладка
+# до начала перехода отдала бы прежний товар. Для готовой страницы
+# возвращается время её загрузки по Navigation Timing, в секундах.
+PAGE_READY_JS = """
+if (performance.timeOrigin <= arguments[1]
+    || document.readyState !== 'complete'
+    || document.querySelector(arguments[0]) === null) return null;
+const nav = performance.getEntriesByType('navigation')[0];
+return nav && nav.loadEventEnd > 0 ? nav.loadEventEnd / 1000 : -1;
+"""
+
+
+def fetch_pages_in_tabs(
+    driver: WebDriver,
+    urls: Iterable[str],
+    tabs: int = 4,
+    ready_selector: str = "a[href*='/seller/'][title]",
+    timeout: float = 25.0,
+    poll_interval: float = 0.2,
+) -> Iterator[tuple[str, Optional[str], float]]:
+    """
+    Загружает страницы одновременно в нескольких вкладках одного браузера.
+    Возвращает (ссылка, page_source, время загрузки) по мере готовности вкладок;
+    если страница не успела загрузиться за timeout, page_source равен None.
+    Время, пока вызывающий код обрабатывает выданную страницу, в timeout не
+    засчитывается: вкладки продолжают грузиться, но ожидание не идёт.
+    """
+    original_window = driver.current_window_handle
+    pending = iter(urls)
+    handles = []
+    # Для каждой вкладки: [ссылка, время ожидания, timeOrigin прежнего
+    # документа] или None, если свободна
+    busy: dict[str, Optional[list]] = {}
+    latencies: dict[str, list[float]] = {}
+
+    def start_next(handle: str) -> None:
+        url = next(pending, None)
+        if url is None:
+            busy[handle] = None
+            return
+        driver.switch_to.window(handle)
+        # Навигация через JS не ждёт загрузки страницы, в отличие от driver.get
+        origin = driver.execute_script(
+            "const origin = performance.timeOrigin;"
+            " window.location.href = arguments[0]; return origin;",
+            url,
+        )
+        busy[handle] = [url, 0.0, origin or 0]
+
+    try:
+        for _ in range(max(tabs, 1)):
+            driver.execute_script("window.open('');")
+            handle = driver.window_handles[-1]
+            handles.append(handle)
+            latencies[handle] = []
+            start_next(handle)
+        logger.info(f"Открыто рабочих вкладок: {len(handles)}")
+
+        last_tick = time.perf_counter()
+        while any(busy.values()):
+            now = time.perf_counter()
+            for task in busy.values():
+                if task is not None:
+                    task[1] += now - last_tick
+            last_tick = now
+
+            harvested = False
+            for handle in handles:
+                task = busy[handle]
+                if task is None:
+                    continue
+                url, waited, origin = task
+                driver.switch_to.window(handle)
+                try:
+                    load_time = driver.execute_script(
+                        PAGE_READY_JS, ready_selector, origin
+                    )
+                except WebDriverException as e:
+                    logger.debug(f"Вкладка ещё не отвечает ({url}): {str(e)}")
+                    load_time = None
+                if load_time is None and waited < timeout:
+                    continue
+
+                page_source = None
+                if load_time is not None:
+                    page_source = driver.page_source
+                    # -1: браузер не отдал Navigation Timing, берётся время ожидания
+                    load_time = load_time if load_time >= 0 else waited
+                    latencies[handle].append(load_time)
+                    logger.debug(f"Страница {url} загружена за {load_time:.2f} с")
+                else:
+                    load_time = waited
+                    logger.warning(f"Страница {url} не загрузилась за {timeout} с")
+                start_next(handle)
+                harvested = True
+                yield url, page_source, load_time
+                # Время обработки страницы вызывающим кодом не считается ожиданием
+                last_tick = time.perf_counter()
+            if not harvested:
+                time.sleep(poll_interval)
+    finally:
+        for handle in handles:
+            try:
+                if handle in driver.window_handles:
+                    driver.switch_to.window(handle)
+                    driver.close()
+            except WebDriverException:
+                pass
+        try:
+            driver.switch_to.window(original_window)
+        except WebDriverException:
+            pass
+        for number, handle in enumerate(handles, start=1):
+            values = sorted(latencies[handle])
+            if values:
+                logger.info(
+                    f"Вкладка {number}: {len(values)} страниц, "
+                    f"загрузка средняя {sum(values) / len(values):.2f} с, "
+                    f"медиана {values[len(values) // 2]:.2f} с, "
+                    f"макс. {values[-1]:.2f} с"
+                )
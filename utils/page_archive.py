@@ -0,0 +1,218 @@
+import gzip
+import hashlib
+import json
+import os
+import time
+from typing import Iterator, Optional
+from utils.logger import get_logger
+
+try:
+    import zstandard
+except ImportError:  # zstd необязателен, по умолчанию используется gzip
+    zstandard = None
+
+logger = get_logger(__name__)
+
+INDEX_FILE = "index.jsonl"
+OBJECTS_DIR = "objects"
+
+
+class PageArchive:
+    """
+    Архив сжатых HTML-страниц с адресацией по содержимому.
+
+    Каждая страница хранится один раз в objects/<sha[:2]>/<sha>.html.<ext>,
+    а index.jsonl связывает её с артикулом, типом страницы и временем загрузки.
+    """
+
+    def __init__(
+        self,
+        root: str = "page_archive",
+        compression: str = "gzip",
+        max_age_days: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+    ) -> None:
+        if compression == "zstd" and zstandard is None:
+            logger.warning("Пакет zstandard не установлен, используется gzip")
+            compression = "gzip"
+        if compression not in ("gzip", "zstd"):
+            raise ValueError(f"Неизвестный тип сжатия: {compression}")
+        self.root = root
+        self.compression = compression
+        self.max_age_days = max_age_days
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(root, INDEX_FILE)
+        # Страницы текущего запуска: для сводки без обхода всего архива
+        self.session = {"pages": 0, "raw_bytes": 0, "objects": 0, "disk_bytes": 0}
+        os.makedirs(os.path.join(root, OBJECTS_DIR), exist_ok=True)
+
+    def _object_path(self, digest: str, compression: Optional[str] = None) -> str:
+        ext = "zst" if (compression or self.compression) == "zstd" else "gz"
+        return os.path.join(
+            self.root, OBJECTS_DIR, digest[:2], f"{digest}.html.{ext}"
+        )
+
+    def _find_object(self, digest: str) -> Optional[str]:
+        for compression in ("gzip", "zstd"):
+            path = self._object_path(digest, compression)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def store(
+        self,
+        page_source: str,
+        url: str,
+        kind: str = "product",
+        product_id: Optional[str] = None,
+    ) -> Optional[str]:
+        """Сохраняет страницу в архив и возвращает её хеш."""
+        try:
+            raw = page_source.encode("utf-8")
+            digest = hashlib.sha256(raw).hexdigest()
+            path = self._find_object(digest)
+            if path is None:
+                path = self._object_path(digest)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                if self.compression == "zstd":
+                    data = zstandard.ZstdCompressor(level=10).compress(raw)
+                else:
+                    data = gzip.compress(raw, compresslevel=6)
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+                self.session["objects"] += 1
+                self.session["disk_bytes"] += len(data)
+            self.session["pages"] += 1
+            self.session["raw_bytes"] += len(raw)
+            entry = {
+                "product_id": product_id,
+                "kind": kind,
+                "url": url,
+                "fetched_at": time.time(),
+                "sha256": digest,
+                "raw_bytes": len(raw),
+                "stored_bytes": os.path.getsize(path),
+            }
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            logger.debug(f"Страница {url} сохранена в архив: {digest}")
+            return digest
+        except Exception as e:
+            logger.warning(f"Ошибка при сохранении страницы {url} в архив: {str(e)}")
+            return None
+
+    def load(self, digest: str) -> str:
+        """Возвращает HTML страницы по её хешу."""
+        path = self._find_object(digest)
+        if path is None:
+            raise KeyError(digest)
+        with open(path, "rb") as f:
+            data = f.read()
+        if path.endswith(".zst"):
+            if zstandard is None:
+                raise RuntimeError("Для чтения .zst нужен пакет zstandard")
+            raw = zstandard.ZstdDecompressor().decompress(data)
+        else:
+            raw = gzip.decompress(data)
+        return raw.decode("utf-8")
+
+    def entries(self) -> Iterator[dict]:
+        """Перебирает записи индекса в порядке добавления."""
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning("Пропущена повреждённая строка индекса архива")
+
+    def prune(self) -> int:
+        """
+        Удаляет устаревшие записи и страницы сверх лимита размера. Без
+        ограничений архив не обходится.
+        """
+        if self.max_age_days is None and self.max_bytes is None:
+            return 0
+        entries = list(self.entries())
+        if self.max_age_days is not None:
+            cutoff = time.time() - self.max_age_days * 86400
+            entries = [e for e in entries if e["fetched_at"] >= cutoff]
+
+        sizes: dict[str, int] = {}
+        for entry in entries:
+            sizes[entry["sha256"]] = entry["stored_bytes"]
+        if self.max_bytes is not None:
+            total = sum(sizes.values())
+            # Записи идут в порядке загрузки, поэтому вытесняем самые старые
+            last_use: dict[str, int] = {}
+            for pos, entry in enumerate(entries):
+                last_use[entry["sha256"]] = pos
+            for digest in sorted(sizes, key=last_use.__getitem__):
+                if total <= self.max_bytes:
+                    break
+                total -= sizes.pop(digest)
+            entries = [e for e in entries if e["sha256"] in sizes]
+
+        removed = 0
+        objects_root = os.path.join(self.root, OBJECTS_DIR)
+        for dirpath, _, filenames in os.walk(objects_root):
+            for filename in filenames:
+                digest = filename.split(".", 1)[0]
+                if digest not in sizes:
+                    os.remove(os.path.join(dirpath, filename))
+                    removed += 1
+
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, self.index_path)
+        if removed:
+            logger.info(f"Из архива удалено страниц: {removed}")
+        return removed
+
+    def stats(self) -> dict[str, float]:
+        """Считает объём архива на диске и его оценку на 10 тысяч страниц."""
+        pages = 0
+        raw_bytes = 0
+        for entry in self.entries():
+            pages += 1
+            raw_bytes += entry["raw_bytes"]
+        disk_bytes = 0
+        objects = 0
+        for dirpath, _, filenames in os.walk(os.path.join(self.root, OBJECTS_DIR)):
+            for filename in filenames:
+                objects += 1
+                disk_bytes += os.path.getsize(os.path.join(dirpath, filename))
+        per_10k = disk_bytes / pages * 10_000 if pages else 0.0
+        return {
+            "pages": pages,
+            "objects": objects,
+            "raw_bytes": raw_bytes,
+            "disk_bytes": disk_bytes,
+            "bytes_per_10k_pages": per_10k,
+        }
+
+    def close(self) -> None:
+        """
+        Применяет ограничения хранения и пишет в лог, сколько добавил текущий
+        запуск. Объём всего архива считает stats(), он обходит все файлы.
+        """
+        self.prune()
+        session = self.session
+        pages = session["pages"]
+        disk_bytes = session["disk_bytes"]
+        ratio = session["raw_bytes"] / disk_bytes if disk_bytes else 0
+        per_10k = disk_bytes / pages * 10_000 if pages else 0.0
+        logger.info(
+            f"Архив страниц: за запуск {pages} записей, {session['objects']} новых "
+            f"файлов, {disk_bytes / 1024**2:.2f} MB (сжатие {ratio:.1f}x), "
+            f"~{per_10k / 1024**2:.1f} MB на 10 тыс. страниц",
+            extra={"metrics": {f"archive_{key}": n for key, n in session.items()}},
+        )
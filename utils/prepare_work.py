@@ -1,34 +1,209 @@
+import os
+import re
+import shutil
+import socket
+import subprocess
+import sys
 import time
+from typing import Optional
+from urllib.parse import quote_plus
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.webdriver import WebDriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from utils.logger import setup_logger
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+from utils.logger import get_logger
+import psutil
 import undetected_chromedriver as uc
 
-logger = setup_logger()
+logger = get_logger(__name__)
 
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".ozon_parser")
+SEARCH_URL = "https://www.ozon.ru/search/?text={query}&from_global=true"
+PRODUCT_LINK_SELECTOR = "a[href*='/product/']"
 
-def preparation_before_work(item_name: str) -> WebDriver:
-    """Функция, которая подготавливает программу для парсинга данных."""
+
+def _chrome_major_version() -> Optional[int]:
+    """Определяет основную версию установленного Chrome."""
+    try:
+        chrome_path = uc.find_chrome_executable()
+        if not chrome_path:
+            return None
+        if sys.platform.startswith("win"):
+            # chrome.exe не печатает версию, но рядом лежит каталог вида 126.0.6478.127
+            for name in os.listdir(os.path.dirname(chrome_path)):
+                match = re.match(r"^(\d+)\.\d+\.\d+\.\d+$", name)
+                if match:
+                    return int(match.group(1))
+            return None
+        output = subprocess.run(
+            [chrome_path, "--version"], capture_output=True, text=True, timeout=10
+        ).stdout
+        match = re.search(r"(\d+)\.\d+\.\d+\.\d+", output)
+        return int(match.group(1)) if match else None
+    except Exception as e:
+        logger.warning(f"Не удалось определить версию Chrome: {str(e)}")
+        return None
+
+
+def _cached_driver_path(version: int) -> str:
+    """Возвращает путь к пропатченному chromedriver для версии Chrome."""
+    name = "chromedriver.exe" if sys.platform.startswith("win") else "chromedriver"
+    return os.path.join(CACHE_DIR, "drivers", str(version), name)
+
+
+def _profile_in_use(path: str) -> bool:
+    """
+    Проверяет, запущен ли Chrome с этим каталогом профиля. На Linux и macOS
+    Chrome держит ссылку SingletonLock вида «хост-pid», на Windows — открытый
+    файл lockfile. Блокировка, оставшаяся после падения браузера, не мешает.
+    """
+    lock = os.path.join(path, "SingletonLock")
+    if os.path.lexists(lock):
+        try:
+            host, _, pid = os.readlink(lock).rpartition("-")
+            return host != socket.gethostname() or psutil.pid_exists(int(pid))
+        except (OSError, ValueError):
+            return True
+    lockfile = os.path.join(path, "lockfile")
+    if os.path.exists(lockfile):
+        try:
+            os.remove(lockfile)
+        except OSError:
+            return True
+    return False
+
+
+def _profile_mtime(path: str) -> float:
+    """Время последнего сохранения профиля: Chrome переписывает Local State при выходе."""
+    local_state = os.path.join(path, "Local State")
+    return os.path.getmtime(local_state) if os.path.exists(local_state) else 0.0
+
+
+def _clone_profile(base_dir: str, worker_dir: str, worker: int) -> None:
+    """
+    Клонирует базовый профиль для воркера. Клон пересоздаётся, когда базовый
+    профиль сохранён позже клонирования, поэтому cookies и кэш воркера не
+    устаревают; собственные изменения клона при этом отбрасываются.
+    """
+    marker = os.path.join(worker_dir, ".cloned")
+    base_mtime = _profile_mtime(base_dir)
+    if os.path.exists(marker) and os.path.getmtime(marker) >= base_mtime:
+        return
+    if os.path.exists(worker_dir) and not base_mtime:
+        return
+    if _profile_in_use(base_dir) or _profile_in_use(worker_dir):
+        return
+    logger.info(f"Клонирование профиля браузера для воркера {worker}")
+    shutil.rmtree(worker_dir, ignore_errors=True)
+    shutil.copytree(
+        base_dir,
+        worker_dir,
+        ignore=shutil.ignore_patterns("Singleton*", "*.lock", "lockfile"),
+    )
+    with open(marker, "w"):
+        pass
+    os.utime(marker, (base_mtime, base_mtime))
+
+
+def _profile_dir(worker: Optional[int] = None) -> Optional[str]:
+    """
+    Возвращает постоянный каталог профиля Chrome. Для воркера профиль
+    клонируется из базового, чтобы параллельные браузеры не делили один каталог.
+    Если каталог уже занят другим запущенным Chrome, возвращается None и
+    браузер запускается с временным профилем, как при параллельных запусках.
+    """
+    base_dir = os.path.join(CACHE_DIR, "profiles", "base")
+    profile_dir = base_dir
+    if worker is not None:
+        profile_dir = os.path.join(CACHE_DIR, "profiles", f"worker-{worker}")
+        if os.path.exists(base_dir):
+            _clone_profile(base_dir, profile_dir, worker)
+    if _profile_in_use(profile_dir):
+        logger.warning(f"Профиль {profile_dir} занят, используется временный профиль")
+        return None
+    return profile_dir
+
+
+def remove_profile(worker: int) -> None:
+    """Удаляет клон профиля воркера."""
+    shutil.rmtree(
+        os.path.join(CACHE_DIR, "profiles", f"worker-{worker}"), ignore_errors=True
+    )
+
+
+def start_browser(worker: Optional[int] = None) -> WebDriver:
+    """
+    Запускает Chrome с кэшированным пропатченным драйвером и постоянным
+    профилем, в котором сохраняются cookies и HTTP-кэш между запусками.
+    Если профиль занят другим запуском, используется временный.
+    """
+    started = time.perf_counter()
     options = Options()
     options.add_argument("--disable-gpu")
     options.add_argument("--no-sandbox")
 
-    driver = uc.Chrome(options=options)
+    version = _chrome_major_version()
+    driver_path = _cached_driver_path(version) if version else None
+    cached = driver_path is not None and os.path.exists(driver_path)
+    if not cached:
+        logger.info("Пропатченный драйвер не найден в кэше, будет загружен")
+
+    driver = uc.Chrome(
+        options=options,
+        user_data_dir=_profile_dir(worker),
+        driver_executable_path=driver_path if cached else None,
+        version_main=version,
+    )
+    if driver_path and not cached:
+        try:
+            os.makedirs(os.path.dirname(driver_path), exist_ok=True)
+            shutil.copy2(driver.patcher.executable_path, driver_path)
+            logger.info(f"Драйвер сохранён в кэш: {driver_path}")
+        except Exception as e:
+            logger.warning(f"Не удалось сохранить драйвер в кэш: {str(e)}")
     driver.implicitly_wait(5)
+    logger.info(f"Браузер запущен за {time.perf_counter() - started:.2f} с")
+    return driver
+
+
+def open_search(driver: WebDriver, item_name: str, timeout: float = 10.0) -> None:
+    """
+    Открывает выдачу по запросу: сначала прямой ссылкой на поиск, а если
+    товары не появились — через ввод запроса на главной странице.
+    """
+    wait = WebDriverWait(driver, timeout)
+    logger.info(f"Открытие поиска по запросу: {item_name}")
+    driver.get(SEARCH_URL.format(query=quote_plus(item_name)))
+    try:
+        wait.until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, PRODUCT_LINK_SELECTOR))
+        )
+        logger.info("Поисковая выдача открыта по прямой ссылке")
+        return
+    except TimeoutException:
+        logger.warning("Прямая ссылка на поиск не сработала, ввод запроса вручную")
 
     logger.info("Переход на сайт Ozon")
     driver.get(url="https://ozon.ru")
-    time.sleep(4)
     logger.info(f"Ввод поискового запроса: {item_name}")
-    find_input = driver.find_element(By.NAME, "text")
+    find_input = wait.until(EC.element_to_be_clickable((By.NAME, "text")))
     find_input.clear()
-    time.sleep(2)
     find_input.send_keys(item_name)
-    time.sleep(2)
     find_input.send_keys(Keys.ENTER)
-    time.sleep(2)
     logger.info("Поисковый запрос отправлен")
+    try:
+        wait.until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, PRODUCT_LINK_SELECTOR))
+        )
+    except TimeoutException:
+        logger.warning("Товары в выдаче не появились за отведённое время")
 
+
+def preparation_before_work(item_name: str, worker: Optional[int] = None) -> WebDriver:
+    """Функция, которая подготавливает программу для парсинга данных."""
+    driver = start_browser(worker=worker)
+    open_search(driver, item_name)
     return driver
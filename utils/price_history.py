@@ -0,0 +1,188 @@
+import sqlite3
+import time
+from typing import Optional
+import pandas as pd
+from utils.logger import get_logger
+from utils.sinks import Sink
+
+logger = get_logger(__name__)
+
+# Отслеживаемые значения: колонка таблицы -> колонка записи о товаре
+TRACKED_COLUMNS = {
+    "card_price": "Цена с картой озона",
+    "discount_price": "Цена со скидкой",
+    "price": "Цена",
+    "rating": "Рейтинг",
+    "reviews": "Отзывы",
+    "seller": "Продавец",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    started_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS observations (
+    sku INTEGER NOT NULL,
+    first_run INTEGER NOT NULL,
+    last_run INTEGER NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    card_price INTEGER,
+    discount_price INTEGER,
+    price INTEGER,
+    rating REAL,
+    reviews INTEGER,
+    seller TEXT,
+    PRIMARY KEY (sku, first_run)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS observations_first_run ON observations (first_run);
+CREATE INDEX IF NOT EXISTS observations_last_run_seller
+    ON observations (last_run, seller, price, rating, reviews);
+"""
+
+SELECT_LAST_SQL = (
+    f"SELECT first_run, last_run, {', '.join(TRACKED_COLUMNS)} FROM observations "
+    "WHERE sku = ? ORDER BY first_run DESC LIMIT 1"
+)
+REPLACE_VALUES_SQL = (
+    f"UPDATE observations SET {', '.join(f'{c} = ?' for c in TRACKED_COLUMNS)}, "
+    "last_seen = ? WHERE sku = ? AND first_run = ?"
+)
+
+
+class PriceHistory(Sink):
+    """
+    Локальная история цен, рейтинга и отзывов по артикулам в SQLite.
+
+    Хранение построено на кодировании длин серий: пока значения товара не
+    меняются, у последней строки лишь продлевается last_run/last_seen, а новая
+    строка появляется при изменении цены, рейтинга, отзывов или продавца, а
+    также после запуска, в котором товара не было.
+    """
+
+    def __init__(
+        self,
+        path: str = "price_history.db",
+        batch_size: int = 1000,
+        start_run: bool = True,
+    ) -> None:
+        """
+        При start_run=False новый запуск не создаётся: история открывается
+        только для запросов, и они по умолчанию относятся к последнему запуску.
+        """
+        super().__init__(path, batch_size)
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        self.changed = 0
+        self.extended = 0
+        self.started = start_run
+        if start_run:
+            with self.connection:
+                cursor = self.connection.execute(
+                    "INSERT INTO runs (started_at) VALUES (?)", (time.time(),)
+                )
+            self.run_id = cursor.lastrowid
+            # Серию продолжает только товар, найденный в предыдущем запуске
+            self.previous_run = self.connection.execute(
+                "SELECT MAX(run_id) FROM runs WHERE run_id < ?", (self.run_id,)
+            ).fetchone()[0]
+        else:
+            self.run_id = self.connection.execute(
+                "SELECT MAX(run_id) FROM runs"
+            ).fetchone()[0]
+
+    def _write_frame(self, df: pd.DataFrame) -> None:
+        if not self.started:
+            raise RuntimeError("История открыта только для чтения")
+        frame = df[["Артикул", *TRACKED_COLUMNS.values()]].dropna(subset=["Артикул"])
+        frame = frame.astype(object).where(frame.notna(), None)
+        now = time.time()
+        with self.connection:
+            for sku, *values in frame.itertuples(index=False, name=None):
+                sku = int(sku)
+                last = self.connection.execute(SELECT_LAST_SQL, (sku,)).fetchone()
+                if (
+                    last is not None
+                    and last[1] in (self.previous_run, self.run_id)
+                    and list(last[2:]) == values
+                ):
+                    self.connection.execute(
+                        "UPDATE observations SET last_run = ?, last_seen = ? "
+                        "WHERE sku = ? AND first_run = ?",
+                        (self.run_id, now, sku, last[0]),
+                    )
+                    self.extended += 1
+                elif last is not None and last[0] == self.run_id:
+                    # Повтор артикула в том же запуске: остаётся последнее значение
+                    self.connection.execute(
+                        REPLACE_VALUES_SQL, (*values, now, sku, self.run_id)
+                    )
+                else:
+                    self.connection.execute(
+                        "INSERT INTO observations VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (sku, self.run_id, self.run_id, now, now, *values),
+                    )
+                    self.changed += 1
+
+    def close(self) -> None:
+        self.flush()
+        if self.started:
+            logger.info(
+                f"История цен (запуск {self.run_id}): изменилось {self.changed}, "
+                f"без изменений {self.extended}"
+            )
+        self.connection.close()
+
+    def history(self, sku: int) -> list[dict]:
+        """Возвращает историю значений товара, по строке на каждое изменение."""
+        cursor = self.connection.execute(
+            "SELECT r1.started_at, r2.started_at, o.first_run, o.last_run, "
+            "o.card_price, o.discount_price, o.price, o.rating, o.reviews, o.seller "
+            "FROM observations o "
+            "JOIN runs r1 ON r1.run_id = o.first_run "
+            "JOIN runs r2 ON r2.run_id = o.last_run "
+            "WHERE o.sku = ? ORDER BY o.first_run",
+            (int(sku),),
+        )
+        columns = ["from", "to", "first_run", "last_run", *TRACKED_COLUMNS]
+        return [dict(zip(columns, row)) for row in cursor]
+
+    def price_drops(
+        self, min_percent: float, column: str = "price", run_id: Optional[int] = None
+    ) -> list[tuple[int, int, int]]:
+        """
+        Возвращает (артикул, прежняя цена, новая цена) для товаров, подешевевших
+        в запуске run_id (по умолчанию текущем) не меньше чем на min_percent.
+        """
+        if column not in ("card_price", "discount_price", "price"):
+            raise ValueError(f"Неизвестная колонка цены: {column}")
+        run_id = run_id or self.run_id
+        previous = self.connection.execute(
+            "SELECT MAX(run_id) FROM runs WHERE run_id < ?", (run_id,)
+        ).fetchone()[0]
+        if previous is None:
+            return []
+        cursor = self.connection.execute(
+            f"SELECT cur.sku, prev.{column}, cur.{column} "
+            "FROM observations cur "
+            "JOIN observations prev ON prev.sku = cur.sku AND prev.last_run = ? "
+            f"WHERE cur.first_run = ? AND prev.{column} > 0 "
+            f"AND cur.{column} <= prev.{column} * (1 - ? / 100.0)",
+            (previous, run_id, min_percent),
+        )
+        return cursor.fetchall()
+
+    def seller_averages(self, run_id: Optional[int] = None) -> list[dict]:
+        """Возвращает средние цену, рейтинг и отзывы по продавцам на запуск run_id."""
+        run_id = run_id or self.run_id
+        cursor = self.connection.execute(
+            "SELECT seller, COUNT(*), AVG(price), AVG(rating), AVG(reviews) "
+            "FROM observations WHERE last_run = ? AND seller IS NOT NULL "
+            "GROUP BY seller ORDER BY COUNT(*) DESC",
+            (run_id,),
+        )
+        columns = ["seller", "products", "avg_price", "avg_rating", "avg_reviews"]
+        return [dict(zip(columns, row)) for row in cursor]
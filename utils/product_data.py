@@ -8,9 +8,99 @@ from selenium.common.exceptions import TimeoutException, WebDriverException
 import time
 import re
 import gc
-from utils.logger import setup_logger
-
-logger = setup_logger()
+from urllib.parse import urljoin
+from utils.logger import get_logger
+from utils.page_archive import PageArchive
+from utils.records import PRODUCT_COLUMNS, sku_from_url
+from utils.retry_queue import FetchError
+
+logger = get_logger(__name__)
+
+OZON_URL = "https://www.ozon.ru"
+
+# Возвращает outerHTML элементов по CSS-селекторам и XPath одним вызовом
+FRAGMENTS_JS = r"""
+const parts = [];
+for (const selector of arguments[0]) {
+    for (const el of document.querySelectorAll(selector)) parts.push(el.outerHTML);
+}
+for (const xpath of arguments[1]) {
+    const found = document.evaluate(
+        xpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null
+    );
+    for (let i = 0; i < found.snapshotLength; i++) {
+        parts.push(found.snapshotItem(i).outerHTML);
+    }
+}
+return parts.join('');
+"""
+
+# Виджеты страницы товара, которые читают экстракторы: (CSS-селекторы, XPath)
+PRODUCT_FRAGMENTS = (
+    (
+        # Блок цен идёт первым, как и на полной странице: запасной поиск
+        # цены берёт первые span с «₽»
+        "[data-widget='webPrice']",
+        "[data-widget='webProductHeading']",
+        "[data-widget='webSingleProductScore']",
+        "[data-widget='breadCrumbs']",
+        "a[href*='/seller/']",
+    ),
+    (
+        '//div[contains(text(), "Артикул: ")]',
+        "//span[contains(text(), 'Ozon Карт')]/ancestor::div[@data-widget][1]"
+        "[not(@data-widget='webPrice')]",
+    ),
+)
+SELLER_FRAGMENTS = (("[data-widget='modalLayout']",), ())
+
+# Заголовки страниц, которые Ozon показывает вместо товара при блокировке
+BLOCKED_MARKERS = ("Доступ ограничен", "Antibot")
+
+# Объём полученного HTML и время его разбора с последнего reset_page_stats
+page_stats = {"pages": 0, "bytes": 0, "parse_seconds": 0.0}
+
+
+def _read_page(
+    driver: WebDriver, fragments: Optional[tuple[tuple[str, ...], tuple[str, ...]]] = None
+) -> Tuple[str, BeautifulSoup]:
+    """Получает HTML страницы целиком или только нужных виджетов и разбирает его."""
+    if fragments:
+        css_selectors, xpaths = fragments
+        html = driver.execute_script(
+            FRAGMENTS_JS, list(css_selectors), list(xpaths)
+        )
+        page_source = f"<html><body>{html or ''}</body></html>"
+    else:
+        page_source = driver.page_source
+    started = time.perf_counter()
+    soup = BeautifulSoup(page_source, "lxml")
+    parse_seconds = time.perf_counter() - started
+    page_bytes = len(page_source.encode("utf-8"))
+    page_stats["pages"] += 1
+    page_stats["bytes"] += page_bytes
+    page_stats["parse_seconds"] += parse_seconds
+    logger.debug(
+        f"Получено {page_bytes / 1024:.1f} KB HTML, разбор {parse_seconds * 1000:.1f} мс"
+    )
+    return page_source, soup
+
+
+def reset_page_stats() -> None:
+    """Обнуляет статистику страниц перед новым запуском в том же процессе."""
+    page_stats.update(pages=0, bytes=0, parse_seconds=0.0)
+
+
+def log_page_stats() -> None:
+    """Пишет в лог средний объём HTML и время разбора на страницу."""
+    pages = page_stats["pages"]
+    if not pages:
+        return
+    logger.info(
+        f"Получено страниц: {pages}, в среднем {page_stats['bytes'] / pages / 1024:.1f} KB "
+        f"HTML и {page_stats['parse_seconds'] / pages * 1000:.1f} мс разбора на страницу",
+        extra={"metrics": dict(page_stats)},
+    )
 
 
 def _get_stars_reviews(soup: BeautifulSoup) -> Tuple[Optional[str], Optional[str]]:
@@ -193,6 +283,42 @@ def _get_product_id(driver: WebDriver) -> Optional[str]:
         element = None  # Очистка переменной
 
 
+def _get_product_id_from_soup(soup: BeautifulSoup) -> Optional[str]:
+    """Извлекает артикул товара из HTML страницы."""
+    try:
+        element = soup.find("div", string=lambda text: text and "Артикул: " in text)
+        if not element:
+            logger.debug("Артикул на странице не найден")
+            return None
+        product_id = element.get_text().split("Артикул: ")[1].strip()
+        logger.debug(f"Извлечён артикул: {product_id}")
+        return product_id
+    except Exception as e:
+        logger.warning(f"Ошибка при извлечении артикула: {str(e)}")
+        return None
+    finally:
+        element = None  # Очистка переменной
+
+
+def _get_seller_href(soup: BeautifulSoup) -> Optional[str]:
+    """Извлекает ссылку на продавца из HTML страницы товара."""
+    seller_link = soup.select_one("a[href*='/seller/'][title]")
+    if not seller_link or not seller_link.get("href"):
+        logger.debug("Ссылка на продавца не найдена")
+        return None
+    return urljoin(OZON_URL, seller_link["href"])
+
+
+def _get_page_url(soup: BeautifulSoup) -> Optional[str]:
+    """Извлекает адрес страницы из link[rel=canonical] или og:url."""
+    tag = soup.select_one("link[rel='canonical'][href]")
+    href = tag["href"] if tag else None
+    if not href:
+        tag = soup.select_one("meta[property='og:url'][content]")
+        href = tag["content"] if tag else None
+    return urljoin(OZON_URL, href) if href else None
+
+
 def _get_product_brand(soup: BeautifulSoup) -> Optional[str]:
     """Извлекает бренд товара из хлебных крошек."""
     try:
@@ -218,218 +344,303 @@ def _get_product_brand(soup: BeautifulSoup) -> Optional[str]:
         )
 
 
+def empty_product_record(url: str) -> dict[str, Optional[str]]:
+    """Возвращает запись о товаре, в которой заполнена только ссылка."""
+    record = dict.fromkeys(PRODUCT_COLUMNS)
+    record["Ссылка на товар"] = url
+    return record
+
+
+def _is_blocked(driver: WebDriver) -> bool:
+    """Проверяет, что вместо страницы открылась проверка антибота."""
+    title = driver.title or ""
+    return any(marker in title for marker in BLOCKED_MARKERS)
+
+
+def card_to_record(url: str, card: dict[str, Optional[str]]) -> dict[str, Optional[str]]:
+    """Собирает запись о товаре из полей карточки поисковой выдачи."""
+    record = empty_product_record(url)
+    sku = sku_from_url(url)
+    record["Артикул"] = str(sku) if sku is not None else None
+    record["Название товара"] = card.get("name")
+    record["Цена с картой озона"] = _clean_price(card.get("card_price")) or None
+    record["Цена"] = _clean_price(card.get("base_price")) or None
+    record["Рейтинг"] = card.get("rating")
+    record["Отзывы"] = card.get("reviews")
+    return record
+
+
+def _extract_page_fields(soup: BeautifulSoup) -> dict[str, Optional[str]]:
+    """Извлекает поля товара, которые есть на самой странице товара."""
+    product_stars, product_reviews = _get_stars_reviews(soup)
+    product_discount_price, product_base_price = _get_full_prices(soup)
+    return {
+        "Название товара": _get_product_name(soup),
+        "Бренд": _get_product_brand(soup),
+        "Цена с картой озона": _get_sale_price(soup),
+        "Цена со скидкой": product_discount_price,
+        "Цена": product_base_price,
+        "Рейтинг": product_stars,
+        "Отзывы": product_reviews,
+        "Продавец": _get_salesman_name(soup),
+    }
+
+
+def _parse_seller_modal(
+    soup: BeautifulSoup, seller_href: str
+) -> Optional[Tuple[str, Optional[str], str]]:
+    """Извлекает имя и ИНН продавца из модального окна (data-widget='modalLayout')."""
+    modal = soup.find("div", attrs={"data-widget": "modalLayout"})
+    if not modal:
+        logger.warning("Модальное окно не найдено")
+        return None
+
+    text_blocks = modal.find_all("div", attrs={"data-widget": "textBlock"})
+    if not text_blocks:
+        logger.warning("Блоки textBlock не найдены в модальном окне")
+        return None
+
+    last_block = text_blocks[-1]
+    spans = last_block.select("div.bq011-a span")
+    if not spans:
+        logger.warning("Не найдены span элементы в последнем textBlock")
+        return None
+
+    spans = spans[:-1]
+    if not spans:
+        logger.warning("Нет данных продавца после исключения последнего span")
+        return None
+
+    text = spans[0].get_text(strip=True)
+    inn_match = re.search(r"^(.+?)(\d{10}|\d{12}|\d{15})$", text)
+    if inn_match:
+        seller_name, inn = inn_match.groups()
+        seller_name = seller_name.strip()
+        logger.info(f"Извлечены данные продавца: {seller_name}, ИНН: {inn}")
+        return (seller_name, inn, seller_href)
+    logger.warning("Не удалось разделить имя и ИНН продавца")
+    return (text, None, seller_href)
+
+
+def extract_product_record(
+    product_html: str,
+    url: str,
+    seller_html: Optional[str] = None,
+) -> dict[str, Optional[str]]:
+    """
+    Собирает запись о товаре из сохранённого HTML без обращения к браузеру.
+    Если вместо ссылки передан путь к файлу, ссылка берётся из самой страницы.
+    """
+    record = empty_product_record(url)
+    soup = BeautifulSoup(product_html, "lxml")
+    try:
+        if not url.startswith(("http://", "https://")):
+            record["Ссылка на товар"] = _get_page_url(soup) or url
+        record["Артикул"] = _get_product_id_from_soup(soup)
+        record.update(_extract_page_fields(soup))
+        seller_href = _get_seller_href(soup)
+        record["Ссылка на продавца"] = seller_href
+    finally:
+        soup.decompose()
+
+    if seller_html and seller_href:
+        seller_soup = BeautifulSoup(seller_html, "lxml")
+        try:
+            seller_info_tuple = _parse_seller_modal(seller_soup, seller_href)
+        finally:
+            seller_soup.decompose()
+        if seller_info_tuple:
+            record["Данные продавца"], record["ИНН продавца"], _ = seller_info_tuple
+    return record
+
+
+def collect_product_info_from_page(
+    driver: WebDriver,
+    url: str,
+    page_source: str,
+    archive: Optional[PageArchive] = None,
+    fragments: bool = False,
+    seller: Optional[Tuple[str, str, str]] = None,
+) -> dict[str, Optional[str]]:
+    """
+    Собирает информацию о товаре из уже загруженной страницы; данные продавца
+    запрашиваются в текущей вкладке driver, если не переданы в seller. Ошибки
+    выбрасываются как FetchError, как в collect_product_info.
+    """
+    record = extract_product_record(page_source, url)
+    if record["Артикул"] is None and not record["Название товара"]:
+        raise FetchError("parse_failure", "Поля товара не извлечены")
+    product_id = record["Артикул"]
+    if archive is not None:
+        archive.store(page_source, url, "product", product_id)
+    seller_href = record["Ссылка на продавца"]
+    if seller is not None:
+        record["Данные продавца"], record["ИНН продавца"], seller_href = seller
+        record["Ссылка на продавца"] = record["Ссылка на продавца"] or seller_href
+    elif seller_href:
+        try:
+            seller_info_tuple = get_ozon_seller_info(
+                driver,
+                seller_href,
+                archive=archive,
+                product_id=product_id,
+                fragments=fragments,
+            )
+        except FetchError as e:
+            raise FetchError(e.kind, e.message, record=record)
+        record["Данные продавца"], record["ИНН продавца"], _ = seller_info_tuple
+    if product_id is None:
+        logger.warning(f"Артикул не извлечён для URL: {url}")
+    else:
+        logger.info(f"Данные о товаре собраны: {record['Название товара']}")
+    return record
+
+
 def get_ozon_seller_info(
-    driver: WebDriver, seller_href: str
-) -> Optional[Tuple[str, str, str]]:
+    driver: WebDriver,
+    seller_href: str,
+    archive: Optional[PageArchive] = None,
+    product_id: Optional[str] = None,
+    fragments: bool = False,
+    timeout: float = 25.0,
+) -> Tuple[str, Optional[str], str]:
     """
-    Извлекает информацию о продавце с сайта Ozon из модального окна (data-widget='modalLayout').
+    Извлекает информацию о продавце с сайта Ozon из модального окна
+    (data-widget='modalLayout') за одну попытку. При неудаче выбрасывается
+    FetchError, повторы выполняет вызывающий код (см. RetryQueue).
     """
     logger.info(f"Получение данных продавца по ссылке: {seller_href}")
     original_window = driver.current_window_handle
+    soup = None
     try:
         driver.get(seller_href)
-        wait = WebDriverWait(driver, 25)
-
-        max_attempts = 3
-        for attempt in range(max_attempts):
-            try:
-                xpath = "//*[name()='svg']/*[name()='path' and @d=\"M12 21c5.584 0 9-3.416 9-9s-3.416-9-9-9-9 3.416-9 9 3.416 9 9 9m1-13a1 1 0 1 1-2 0 1 1 0 0 1 2 0m-2 4a1 1 0 1 1 2 0v4a1 1 0 1 1-2 0z\"]/ancestor::button"
-                clickable_button = wait.until(
-                    EC.element_to_be_clickable((By.XPATH, xpath))
+        wait = WebDriverWait(driver, timeout)
+        xpath = "//*[name()='svg']/*[name()='path' and @d=\"M12 21c5.584 0 9-3.416 9-9s-3.416-9-9-9-9 3.416-9 9 3.416 9 9 9m1-13a1 1 0 1 1-2 0 1 1 0 0 1 2 0m-2 4a1 1 0 1 1 2 0v4a1 1 0 1 1-2 0z\"]/ancestor::button"
+        try:
+            clickable_button = wait.until(EC.element_to_be_clickable((By.XPATH, xpath)))
+        except TimeoutException:
+            raise FetchError(
+                "missing_seller", "Не найдена кнопка информации о продавце"
+            )
+        clickable_button.click()
+        logger.info("Нажата кнопка информации о продавце")
+        try:
+            wait.until(
+                EC.presence_of_element_located(
+                    (By.CSS_SELECTOR, "[data-widget='modalLayout']")
                 )
-                clickable_button.click()
-                time.sleep(1.5)
-                logger.info("Нажата кнопка информации о продавце")
-                break
-            except TimeoutException:
-                if attempt == max_attempts - 1:
-                    logger.warning(
-                        "Не удалось нажать кнопку информации о продавце после всех попыток"
-                    )
-                    return None
-                time.sleep(1.5)
-
-        soup = BeautifulSoup(driver.page_source, "lxml")
-        modal = soup.find("div", attrs={"data-widget": "modalLayout"})
-        if not modal:
-            logger.warning("Модальное окно не найдено")
-            return None
-
-        text_blocks = modal.find_all("div", attrs={"data-widget": "textBlock"})
-        if not text_blocks:
-            logger.warning("Блоки textBlock не найдены в модальном окне")
-            return None
-
-        last_block = text_blocks[-1]
-        spans = last_block.select("div.bq011-a span")
-        if not spans:
-            logger.warning("Не найдены span элементы в последнем textBlock")
-            return None
-
-        spans = spans[:-1]
-        if not spans:
-            logger.warning("Нет данных продавца после исключения последнего span")
-            return None
+            )
+        except TimeoutException:
+            raise FetchError("missing_seller", "Модальное окно продавца не открылось")
 
-        text = spans[0].get_text(strip=True)
-        inn_match = re.search(r"^(.+?)(\d{10}|\d{12}|\d{15})$", text)
-        if inn_match:
-            seller_name, inn = inn_match.groups()
-            seller_name = seller_name.strip()
-            logger.info(f"Извлечены данные продавца: {seller_name}, ИНН: {inn}")
-            return (seller_name, inn, seller_href)
-        else:
-            logger.warning("Не удалось разделить имя и ИНН продавца")
-            return (text, None, seller_href)
-
-    except (TimeoutException, WebDriverException, IndexError) as e:
-        logger.warning(
-            f"Ошибка при получении данных продавца по ссылке {seller_href}: {str(e)}"
+        page_source, soup = _read_page(
+            driver, SELLER_FRAGMENTS if fragments else None
         )
-        return None
+        if archive is not None:
+            archive.store(page_source, seller_href, "seller", product_id)
+        page_source = None
+        seller_info_tuple = _parse_seller_modal(soup, seller_href)
+        if seller_info_tuple is None:
+            raise FetchError("missing_seller", "Данные продавца не разобраны")
+        return seller_info_tuple
+
+    except TimeoutException as e:
+        raise FetchError("timeout", str(e).strip() or "Превышено время ожидания")
+    except WebDriverException as e:
+        raise FetchError("browser_error", str(e).strip().splitlines()[0])
+    except IndexError as e:
+        raise FetchError("missing_seller", str(e))
     finally:
-        if "soup" in locals():
+        if soup is not None:
             soup.decompose()  # Очистка объекта BeautifulSoup
-        modal = text_blocks = last_block = spans = clickable_button = (
-            None  # Очистка переменных
-        )
+        clickable_button = None  # Очистка переменной
         driver.switch_to.window(original_window)
         gc.collect()  # Принудительная сборка мусора
 
 
-def collect_product_info(driver: WebDriver, url: str) -> dict[str, Optional[str]]:
+def collect_product_info(
+    driver: WebDriver,
+    url: str,
+    archive: Optional[PageArchive] = None,
+    fragments: bool = False,
+    seller: Optional[Tuple[str, str, str]] = None,
+    timeout: float = 25.0,
+) -> dict[str, Optional[str]]:
     """
-    Собирает информацию о товаре с сайта Ozon с повторными попытками при неудаче.
+    Собирает информацию о товаре с сайта Ozon за одну попытку. При неудаче
+    выбрасывается FetchError с классом ошибки, а повтор откладывается
+    вызывающим кодом (см. RetryQueue), чтобы одна страница не тормозила проход.
+    Если данные продавца уже известны (seller), страница продавца не открывается.
     """
     logger.info(f"Обработка URL товара: {url}")
-    max_retries = 3
-    attempt = 1
+    soup = None
+    try:
+        driver.get(url)
+        page_source, soup = _read_page(
+            driver, PRODUCT_FRAGMENTS if fragments else None
+        )
+        if _is_blocked(driver):
+            raise FetchError("blocked", f"Страница проверки вместо товара: {driver.title}")
 
-    while attempt <= max_retries:
+        seller_href = None
+        seller_timeout = False
         try:
-            driver.get(url)
-            wait = WebDriverWait(driver, 25)
-            soup = BeautifulSoup(driver.page_source, "lxml")
-
-            seller_href = None
-            try:
-                seller_link = wait.until(
-                    EC.presence_of_element_located(
-                        (By.CSS_SELECTOR, "a[href*='/seller/'][title]")
-                    )
-                )
-                seller_href = seller_link.get_attribute("href")
-                logger.debug(f"Извлечена ссылка на продавца: {seller_href}")
-            except TimeoutException:
-                logger.warning("Не удалось извлечь ссылку на продавца")
-
-            product_id = _get_product_id(driver)
-            product_name = _get_product_name(soup)
-            product_stars, product_reviews = _get_stars_reviews(soup)
-            product_ozon_card_price = _get_sale_price(soup)
-            product_discount_price, product_base_price = _get_full_prices(soup)
-            salesman = _get_salesman_name(soup)
-            product_brand = _get_product_brand(soup)
-
-            seller_info = None
-            seller_inn = None
-            if seller_href:
-                seller_info_tuple = get_ozon_seller_info(driver, seller_href)
-                if seller_info_tuple:
-                    seller_info, seller_inn, _ = seller_info_tuple
-
-            # Проверяем, есть ли None в критически важных полях
-            critical_fields = [
-                product_id,
-                product_name,
-                product_ozon_card_price,
-                product_discount_price,
-                product_base_price,
-                product_stars,
-                product_reviews,
-                salesman,
-                product_brand,
-                seller_info,
-                seller_inn,
-            ]
-
-            if all(
-                field is None or (isinstance(field, str) and not field)
-                for field in critical_fields
-            ):
-                logger.warning(
-                    f"Попытка {attempt} не удалась: все поля пустые для URL {url}"
+            seller_link = WebDriverWait(driver, timeout).until(
+                EC.presence_of_element_located(
+                    (By.CSS_SELECTOR, "a[href*='/seller/'][title]")
                 )
-                if attempt == max_retries:
-                    logger.error(
-                        f"Достигнуто максимальное количество попыток для URL {url}"
-                    )
-                    return {
-                        "Артикул": None,
-                        "Название товара": None,
-                        "Бренд": None,
-                        "Цена с картой озона": None,
-                        "Цена со скидкой": None,
-                        "Цена": None,
-                        "Рейтинг": None,
-                        "Отзывы": None,
-                        "Продавец": None,
-                        "Ссылка на продавца": None,
-                        "Данные продавца": None,
-                        "ИНН продавца": None,
-                        "Ссылка на товар": url,
-                    }
-                attempt += 1
-                time.sleep(2)  # Пауза перед повторной попыткой
-                continue
-
-            if not product_name:
-                logger.warning(f"Название товара не извлечено для URL: {url}")
-
-            logger.info(f"Данные о товаре собраны: {product_name}")
-            return {
-                "Артикул": product_id,
-                "Название товара": product_name,
-                "Бренд": product_brand,
-                "Цена с картой озона": product_ozon_card_price,
-                "Цена со скидкой": product_discount_price,
-                "Цена": product_base_price,
-                "Рейтинг": product_stars,
-                "Отзывы": product_reviews,
-                "Продавец": salesman,
-                "Ссылка на продавца": seller_href,
-                "Данные продавца": seller_info,
-                "ИНН продавца": seller_inn,
-                "Ссылка на товар": url,
-            }
-
-        except (TimeoutException, WebDriverException) as e:
-            logger.warning(
-                f"Ошибка при обработке URL товара {url} на попытке {attempt}: {str(e)}"
             )
-            if attempt == max_retries:
-                logger.error(
-                    f"Достигнуто максимальное количество попыток для URL {url}"
+            seller_href = seller_link.get_attribute("href")
+            logger.debug(f"Извлечена ссылка на продавца: {seller_href}")
+        except TimeoutException:
+            seller_timeout = True
+            logger.warning("Не удалось извлечь ссылку на продавца")
+
+        product_id = _get_product_id(driver)
+        if archive is not None:
+            archive.store(page_source, url, "product", product_id)
+        page_source = None
+        page_fields = _extract_page_fields(soup)
+
+        if product_id is None and not any(page_fields.values()):
+            if seller_timeout:
+                raise FetchError("timeout", "Страница товара не загрузилась")
+            raise FetchError("parse_failure", "Поля товара не извлечены")
+
+        record = empty_product_record(url)
+        record.update(page_fields)
+        record["Артикул"] = product_id
+        if seller is not None:
+            record["Данные продавца"], record["ИНН продавца"], known_href = seller
+            seller_href = seller_href or known_href
+        elif seller_href:
+            record["Ссылка на продавца"] = seller_href
+            try:
+                seller_info_tuple = get_ozon_seller_info(
+                    driver,
+                    seller_href,
+                    archive=archive,
+                    product_id=product_id,
+                    fragments=fragments,
+                    timeout=timeout,
                 )
-                return {
-                    "Артикул": None,
-                    "Название товара": None,
-                    "Бренд": None,
-                    "Цена с картой озона": None,
-                    "Цена со скидкой": None,
-                    "Цена": None,
-                    "Рейтинг": None,
-                    "Отзывы": None,
-                    "Продавец": None,
-                    "Ссылка на продавца": None,
-                    "Данные продавца": None,
-                    "ИНН продавца": None,
-                    "Ссылка на товар": url,
-                }
-            attempt += 1
-            time.sleep(2)  # Пауза перед повторной попыткой
-        finally:
-            if "soup" in locals():
-                soup.decompose()  # Очистка объекта BeautifulSoup
-            seller_link = None  # Очистка переменной
-            gc.collect()  # Принудительная сборка мусора
+            except FetchError as e:
+                # Запись товара сохраняется, чтобы её можно было записать после всех попыток
+                raise FetchError(e.kind, e.message, record=record)
+            record["Данные продавца"], record["ИНН продавца"], _ = seller_info_tuple
+        record["Ссылка на продавца"] = seller_href
+
+        if not record["Название товара"]:
+            logger.warning(f"Название товара не извлечено для URL: {url}")
+        logger.info(f"Данные о товаре собраны: {record['Название товара']}")
+        return record
+
+    except TimeoutException as e:
+        raise FetchError("timeout", str(e).strip() or "Превышено время ожидания")
+    except WebDriverException as e:
+        raise FetchError("browser_error", str(e).strip().splitlines()[0])
+    finally:
+        if soup is not None:
+            soup.decompose()  # Очистка объекта BeautifulSoup
+        seller_link = None  # Очистка переменной
+        gc.collect()  # Принудительная сборка мусора
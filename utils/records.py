@@ -0,0 +1,125 @@
+import re
+from dataclasses import dataclass, fields
+from typing import Iterable, Mapping, Optional
+import pandas as pd
+
+PRODUCT_COLUMNS = (
+    "Артикул",
+    "Название товара",
+    "Бренд",
+    "Цена с картой озона",
+    "Цена со скидкой",
+    "Цена",
+    "Рейтинг",
+    "Отзывы",
+    "Продавец",
+    "Ссылка на продавца",
+    "Данные продавца",
+    "ИНН продавца",
+    "Ссылка на товар",
+)
+
+# Цены в типизированных выходных данных хранятся целым числом копеек;
+# в Excel они выводятся в рублях с форматом EXCEL_PRICE_FORMAT
+PRICE_COLUMNS = ("Цена с картой озона", "Цена со скидкой", "Цена")
+EXCEL_PRICE_FORMAT = "#,##0.00"
+
+# Артикул в ссылке: /product/<название>-<артикул>/ или /product/<артикул>/,
+# косая черта в конце и параметры запроса необязательны
+SKU_URL_RE = re.compile(r"/product/(?:[^/?#]*-)?(\d+)/?(?:[?#]|$)")
+
+
+@dataclass(slots=True)
+class ProductRecord:
+    """
+    Компактная запись о товаре. Поля хранятся в том виде, в котором их вернули
+    экстракторы, а числа разбираются один раз при записи (см. records_to_frame).
+    """
+
+    sku: Optional[str] = None
+    name: Optional[str] = None
+    brand: Optional[str] = None
+    card_price: Optional[str] = None
+    discount_price: Optional[str] = None
+    price: Optional[str] = None
+    rating: Optional[str] = None
+    reviews: Optional[str] = None
+    salesman: Optional[str] = None
+    seller_href: Optional[str] = None
+    seller_info: Optional[str] = None
+    seller_inn: Optional[str] = None
+    url: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Optional[str]]) -> "ProductRecord":
+        """Создаёт запись из словаря с русскими названиями колонок."""
+        return cls(*(data.get(column) for column in PRODUCT_COLUMNS))
+
+    def to_dict(self) -> dict[str, Optional[str]]:
+        """Возвращает запись в виде словаря с русскими названиями колонок."""
+        return {
+            column: getattr(self, field.name)
+            for column, field in zip(PRODUCT_COLUMNS, fields(self))
+        }
+
+
+def sku_to_int(product_id: Optional[str]) -> Optional[int]:
+    """Переводит артикул в целое число для компактного множества дублей."""
+    if not product_id:
+        return None
+    digits = re.sub(r"\D", "", product_id)
+    return int(digits) if digits else None
+
+
+def sku_from_url(url: str) -> Optional[int]:
+    """Извлекает артикул из ссылки на товар."""
+    match = SKU_URL_RE.search(url)
+    return int(match.group(1)) if match else None
+
+
+def _to_kopecks(values: pd.Series) -> pd.Series:
+    """Переводит строки вида «1 299,50» в целое число копеек."""
+    cleaned = (
+        values.astype("string")
+        .str.replace(r"[^\d,.]", "", regex=True)
+        .str.replace(",", ".", regex=False)
+    )
+    rubles = pd.to_numeric(cleaned, errors="coerce")
+    return (rubles * 100).round().astype("Int64")
+
+
+def _to_int(values: pd.Series) -> pd.Series:
+    """Извлекает целое число из строк вида «1 234 отзыва»."""
+    digits = values.astype("string").str.replace(r"\D", "", regex=True)
+    return pd.to_numeric(digits.replace("", pd.NA), errors="coerce").astype("Int64")
+
+
+def records_to_frame(records: Iterable[ProductRecord]) -> pd.DataFrame:
+    """
+    Собирает DataFrame из записей и векторно разбирает числовые колонки:
+    артикул и отзывы — Int64, рейтинг — float, цены — Int64 в копейках.
+    """
+    names = [field.name for field in fields(ProductRecord)]
+    columns: dict[str, list] = {column: [] for column in PRODUCT_COLUMNS}
+    for record in records:
+        for column, name in zip(PRODUCT_COLUMNS, names):
+            columns[column].append(getattr(record, name))
+    df = pd.DataFrame(columns, columns=list(PRODUCT_COLUMNS))
+
+    df["Артикул"] = _to_int(df["Артикул"])
+    for column in PRICE_COLUMNS:
+        df[column] = _to_kopecks(df[column])
+    df["Рейтинг"] = pd.to_numeric(
+        df["Рейтинг"].astype("string").str.replace(",", ".", regex=False),
+        errors="coerce",
+    )
+    df["Отзывы"] = _to_int(df["Отзывы"])
+    return df
+
+
+def prices_to_rubles(df: pd.DataFrame) -> pd.DataFrame:
+    """Переводит колонки цен из копеек в рубли для вывода в Excel."""
+    df = df.copy()
+    for column in PRICE_COLUMNS:
+        df[column] = df[column].astype("Float64") / 100
+    return df
@@ -0,0 +1,121 @@
+import heapq
+import json
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Классы ошибок загрузки товара
+ERROR_CLASSES = ("timeout", "blocked", "missing_seller", "parse_failure", "browser_error")
+
+
+class FetchError(Exception):
+    """
+    Неудачная загрузка товара. kind — один из ERROR_CLASSES; record — частично
+    собранная запись, если она есть (например, товар без данных продавца).
+    """
+
+    def __init__(self, kind: str, message: str, record: Optional[dict] = None) -> None:
+        super().__init__(f"{kind}: {message}")
+        self.kind = kind
+        self.message = message
+        self.record = record
+
+
+@dataclass(slots=True)
+class Attempt:
+    """Одна неудачная попытка загрузки ссылки."""
+
+    kind: str
+    message: str
+    at: float = field(default_factory=time.time)
+
+
+class RetryQueue:
+    """
+    Отложенные повторы неудачных ссылок. Ссылка возвращается в работу не
+    раньше чем через delay * номер попытки секунд, поэтому основной проход не
+    ждёт проблемную страницу, а повторы выполняются между другими товарами
+    (due) или после прохода (drain). По каждой ссылке хранится история попыток.
+    """
+
+    def __init__(self, max_attempts: int = 3, delay: float = 30.0) -> None:
+        self.max_attempts = max_attempts
+        self.delay = delay
+        self.attempts: dict[str, list[Attempt]] = {}
+        self.failed: dict[str, list[Attempt]] = {}
+        self.recovered: set[str] = set()
+        self._heap: list[tuple[float, str]] = []
+
+    def defer(self, url: str, error: FetchError) -> bool:
+        """
+        Записывает неудачу и откладывает повтор. Возвращает True, если попытки
+        исчерпаны и ссылка перенесена в отчёт о неудачах.
+        """
+        history = self.attempts.setdefault(url, [])
+        history.append(Attempt(error.kind, error.message))
+        if len(history) >= self.max_attempts:
+            self.failed[url] = history
+            logger.error(
+                f"Ссылка не обработана после {len(history)} попыток ({error.kind}): {url}"
+            )
+            return True
+        heapq.heappush(self._heap, (time.time() + self.delay * len(history), url))
+        logger.warning(
+            f"Попытка {len(history)} не удалась ({error.kind}), повтор отложен: {url}"
+        )
+        return False
+
+    def resolve(self, url: str) -> None:
+        """Отмечает, что ссылка успешно обработана после неудачных попыток."""
+        if url in self.attempts:
+            self.recovered.add(url)
+
+    def due(self) -> Iterator[str]:
+        """Выдаёт ссылки, время повтора которых уже наступило, не ожидая остальных."""
+        while self._heap and self._heap[0][0] <= time.time():
+            yield heapq.heappop(self._heap)[1]
+
+    def drain(self) -> Iterator[str]:
+        """Выдаёт все отложенные ссылки, дожидаясь времени их повтора."""
+        while self._heap:
+            ready_at, url = heapq.heappop(self._heap)
+            wait = ready_at - time.time()
+            if wait > 0:
+                time.sleep(wait)
+            yield url
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def write_report(self, path: str) -> None:
+        """Пишет отчёт о неудачных ссылках в JSON Lines и сводку в лог."""
+        kinds = Counter(history[-1].kind for history in self.failed.values())
+        logger.info(
+            f"Повторы: восстановлено {len(self.recovered)}, не обработано "
+            f"{len(self.failed)} {dict(kinds)}",
+            extra={
+                "metrics": {
+                    "recovered": len(self.recovered),
+                    "failed": len(self.failed),
+                    **{f"failed_{kind}": count for kind, count in kinds.items()},
+                }
+            },
+        )
+        if not self.failed:
+            return
+        with open(path, "w", encoding="utf-8") as f:
+            for url, history in self.failed.items():
+                line = {
+                    "url": url,
+                    "error": history[-1].kind,
+                    "attempts": [
+                        {"kind": a.kind, "message": a.message, "at": a.at}
+                        for a in history
+                    ],
+                }
+                f.write(json.dumps(line, ensure_ascii=False) + "\n")
+        logger.info(f"Отчёт о неудачных ссылках сохранён: {path}")
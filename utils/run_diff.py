@@ -0,0 +1,131 @@
+import hashlib
+import json
+import os
+import time
+import numpy as np
+import pandas as pd
+from utils.logger import get_logger
+from utils.records import PRODUCT_COLUMNS
+from utils.sinks import Sink
+
+logger = get_logger(__name__)
+
+# Индекс запуска: артикул, хэш записи и смещение её строки в снимке
+INDEX_DTYPE = np.dtype([("sku", "<i8"), ("hash", "<u8"), ("offset", "<i8")])
+# Поля, изменения которых попадают в отчёт (артикул — ключ сравнения)
+DIFF_COLUMNS = PRODUCT_COLUMNS[1:]
+
+
+def record_hash(payload: bytes) -> int:
+    """Возвращает стабильный 64-битный хэш сериализованных полей записи."""
+    return int.from_bytes(hashlib.blake2b(payload, digest_size=8).digest(), "little")
+
+
+def _read_values(snapshot, offset: int) -> list:
+    """Читает поля записи из снимка по смещению строки."""
+    snapshot.seek(offset)
+    _, payload = snapshot.readline().split(b"\t", 1)
+    return json.loads(payload)
+
+
+class RunDiff(Sink):
+    """
+    Отчёт об изменениях относительно предыдущего запуска.
+
+    Каждая запись сериализуется один раз: строка дописывается в снимок
+    запуска, а в индекс попадают артикул, хэш строки и её смещение. При
+    закрытии индекс прошлого запуска проходится один раз: совпавшие хэши
+    пропускаются без чтения, и только для изменённых и исчезнувших товаров
+    строки читаются из снимков по смещению. Отчёт пишется в JSON Lines.
+    """
+
+    def __init__(
+        self,
+        path: str = "run_diff.jsonl",
+        state_dir: str = "run_state",
+        batch_size: int = 1000,
+    ) -> None:
+        super().__init__(path, batch_size)
+        os.makedirs(state_dir, exist_ok=True)
+        self.snapshot_path = os.path.join(state_dir, "snapshot.jsonl")
+        self.index_path = os.path.join(state_dir, "index.npy")
+        self._snapshot = open(f"{self.snapshot_path}.new", "wb")
+        self._index: dict[int, tuple[int, int]] = {}
+        self.summary = {"added": 0, "removed": 0, "changed": 0, "unchanged": 0}
+
+    def _write_frame(self, df: pd.DataFrame) -> None:
+        frame = df[list(PRODUCT_COLUMNS)].dropna(subset=["Артикул"]).astype(object)
+        frame = frame.where(frame.notna(), None)
+        for sku, *values in frame.itertuples(index=False, name=None):
+            sku = int(sku)
+            # Как и в приёмниках, остаётся первая запись артикула
+            if sku in self._index:
+                continue
+            payload = json.dumps(values, ensure_ascii=False, separators=(",", ":"))
+            payload = payload.encode("utf-8")
+            self._index[sku] = (record_hash(payload), self._snapshot.tell())
+            self._snapshot.write(b"%d\t%s\n" % (sku, payload))
+
+    def close(self) -> None:
+        self.flush()
+        self._snapshot.close()
+        started = time.perf_counter()
+        index = np.array(
+            [(sku, h, offset) for sku, (h, offset) in self._index.items()],
+            dtype=INDEX_DTYPE,
+        )
+        index.sort(order="sku")
+
+        with open(self.path, "w", encoding="utf-8") as report:
+            if os.path.exists(self.index_path) and os.path.exists(self.snapshot_path):
+                self._write_diff(report)
+            else:
+                logger.info("Предыдущий запуск не найден, отчёт об изменениях пуст")
+
+        with open(f"{self.index_path}.new", "wb") as f:
+            np.save(f, index)
+        os.replace(f"{self.snapshot_path}.new", self.snapshot_path)
+        os.replace(f"{self.index_path}.new", self.index_path)
+
+        elapsed = time.perf_counter() - started
+        logger.info(
+            f"Изменения относительно прошлого запуска: новых {self.summary['added']}, "
+            f"исчезло {self.summary['removed']}, изменилось {self.summary['changed']}, "
+            f"без изменений {self.summary['unchanged']} ({elapsed:.2f} с)",
+            extra={"metrics": {**self.summary, "diff_seconds": elapsed}},
+        )
+
+    def _write_diff(self, report) -> None:
+        """Сравнивает текущий запуск с индексом прошлого за один проход."""
+        previous = np.load(self.index_path)
+        remaining = dict(self._index)
+
+        def emit(change: str, sku: int, **fields) -> None:
+            self.summary[change] += 1
+            line = {"change": change, "sku": sku, **fields}
+            report.write(json.dumps(line, ensure_ascii=False) + "\n")
+
+        with open(self.snapshot_path, "rb") as old, open(
+            f"{self.snapshot_path}.new", "rb"
+        ) as new:
+            for sku, old_hash, old_offset in previous.tolist():
+                current = remaining.pop(sku, None)
+                if current is None:
+                    values = _read_values(old, old_offset)
+                    emit("removed", sku, record=dict(zip(DIFF_COLUMNS, values)))
+                elif current[0] == old_hash:
+                    self.summary["unchanged"] += 1
+                else:
+                    old_values = _read_values(old, old_offset)
+                    new_values = _read_values(new, current[1])
+                    changed = {
+                        column: [before, after]
+                        for column, before, after in zip(
+                            DIFF_COLUMNS, old_values, new_values
+                        )
+                        if before != after
+                    }
+                    emit("changed", sku, fields=changed)
+            for sku, (_, offset) in remaining.items():
+                values = _read_values(new, offset)
+                emit("added", sku, record=dict(zip(DIFF_COLUMNS, values)))
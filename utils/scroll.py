@@ -5,9 +5,42 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import StaleElementReferenceException
-from utils.logger import setup_logger
+from utils.logger import get_logger
 
-logger = setup_logger()
+logger = get_logger(__name__)
+
+# Собирает поля карточек выдачи за один вызов execute_script.
+# На карточке первой идёт цена с Ozon Картой, следом зачёркнутая цена.
+EXTRACT_CARDS_JS = r"""
+const tiles = new Map();
+for (const a of document.querySelectorAll(arguments[0])) {
+    if (!a.href || !a.href.includes('/product/')) continue;
+    const tile = a.closest('[data-index]') || a.parentElement;
+    if (!tile || tiles.has(tile)) continue;
+    tiles.set(tile, a.href);
+}
+const cards = [];
+for (const [tile, href] of tiles) {
+    const texts = Array.from(tile.querySelectorAll('span'))
+        .map(s => s.textContent.trim())
+        .filter(Boolean);
+    const prices = texts.filter(t => t.includes('₽') && /\d/.test(t));
+    let name = null;
+    for (const a of tile.querySelectorAll("a[href*='/product/']")) {
+        const text = a.textContent.trim();
+        if (text && (!name || text.length > name.length)) name = text;
+    }
+    cards.push({
+        href: href,
+        name: name,
+        card_price: prices.length ? prices[0] : null,
+        base_price: prices.length > 1 ? prices[prices.length - 1] : null,
+        rating: texts.find(t => /^\d[.,]\d$/.test(t)) || null,
+        reviews: texts.find(t => /\d.*отзыв/.test(t)) || null,
+    });
+}
+return cards;
+"""
 
 
 def page_down(
@@ -18,9 +51,13 @@ def page_down(
     colvo: int = 1000,
     scroll_step: int = 500,
     scroll_interval: float = 0.5,
-    temp_file: str = "temp_links.txt"
+    temp_file: str = "temp_links.txt",
+    cards: dict[str, dict] | None = None,
 ) -> list[str]:
-    """Функция, которая плавно скроллит страницу и собирает ссылки на продукты."""
+    """
+    Функция, которая плавно скроллит страницу и собирает ссылки на продукты.
+    Если передан словарь cards, в него складываются поля карточек выдачи.
+    """
     collected_links = set()
     last_height = driver.execute_script("return document.body.scrollHeight")
     attempts = 0
@@ -52,9 +89,21 @@ def page_down(
             )
             # Собираем ссылки сразу после нахождения элементов
             new_links = set()
-            find_links = driver.find_elements(By.CSS_SELECTOR, css_selector)
-            logger.info(
-                f"Найдено элементов на текущей итерации: {len(find_links)}")
+            if cards is not None:
+                find_links = []
+                batch = driver.execute_script(EXTRACT_CARDS_JS, css_selector)
+                logger.info(
+                    f"Найдено карточек на текущей итерации: {len(batch)}")
+                for card in batch:
+                    href = card.pop("href", None)
+                    if href:
+                        new_links.add(href)
+                        cards[href] = card
+            else:
+                find_links = driver.find_elements(
+                    By.CSS_SELECTOR, css_selector)
+                logger.info(
+                    f"Найдено элементов на текущей итерации: {len(find_links)}")
             for link in find_links:
                 try:
                     href = link.get_attribute("href")
@@ -67,16 +116,17 @@ def page_down(
                 except Exception as e:
                     logger.warning(f"Ошибка при получении href: {str(e)}")
                     continue
+            new_links -= collected_links
             collected_links.update(new_links)
             logger.info(
                 f"Собрано новых ссылок: {len(new_links)}, всего: {len(collected_links)}")
 
-            # Сохраняем ссылки в файл
+            # Дописываем в файл только новые ссылки, не переписывая весь набор
             try:
-                with open(temp_file, "w", encoding="utf-8") as f:
-                    for link in collected_links:
-                        f.write(f"{link}\n")
-                logger.debug(f"Ссылки сохранены в {temp_file}")
+                if new_links:
+                    with open(temp_file, "a", encoding="utf-8") as f:
+                        f.writelines(f"{link}\n" for link in new_links)
+                    logger.debug(f"Ссылки сохранены в {temp_file}")
             except Exception as e:
                 logger.warning(
                     f"Ошибка при сохранении в {temp_file}: {str(e)}")
@@ -0,0 +1,64 @@
+import re
+from typing import Optional, Tuple
+from selenium.webdriver.chrome.webdriver import WebDriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+from utils.logger import get_logger
+from utils.page_archive import PageArchive
+from utils.prepare_work import PRODUCT_LINK_SELECTOR
+from utils.product_data import get_ozon_seller_info
+from utils.retry_queue import FetchError
+from utils.scroll import page_down
+
+logger = get_logger(__name__)
+
+
+def _seller_slug(seller_href: str) -> str:
+    """Возвращает часть ссылки /seller/<slug>/ для имени временного файла."""
+    match = re.search(r"/seller/([^/?#]+)", seller_href)
+    return match.group(1) if match else re.sub(r"\W+", "_", seller_href)
+
+
+def collect_seller_catalog(
+    driver: WebDriver,
+    seller_href: str,
+    max_products: int = 1000,
+    archive: Optional[PageArchive] = None,
+    fragments: bool = False,
+    timeout: float = 25.0,
+) -> Tuple[Tuple[Optional[str], Optional[str], str], list[str]]:
+    """
+    Получает данные продавца один раз и собирает ссылки на товары с его
+    витрины. Возвращает (данные продавца, ИНН, ссылка) и список ссылок.
+    """
+    try:
+        seller = get_ozon_seller_info(
+            driver, seller_href, archive=archive, fragments=fragments, timeout=timeout
+        )
+    except FetchError as e:
+        # Повторять запрос для каждого товара бессмысленно: продавец тот же
+        logger.warning(
+            f"Данные продавца не получены ({e.kind}), товары без ИНН: {seller_href}"
+        )
+        seller = (None, None, seller_href)
+
+    # После get_ozon_seller_info на странице открыто модальное окно
+    driver.get(seller_href)
+    try:
+        WebDriverWait(driver, timeout).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, PRODUCT_LINK_SELECTOR))
+        )
+    except TimeoutException:
+        logger.warning(f"Товары на витрине продавца не появились: {seller_href}")
+        return seller, []
+
+    products_urls = page_down(
+        driver=driver,
+        css_selector=PRODUCT_LINK_SELECTOR,
+        colvo=max_products,
+        temp_file=f"temp_links_seller_{_seller_slug(seller_href)}.txt",
+    )
+    logger.info(f"Товаров на витрине {seller_href}: {len(products_urls)}")
+    return seller, products_urls
@@ -0,0 +1,286 @@
+import os
+import sqlite3
+from abc import ABC, abstractmethod
+import time
+from typing import Iterable, Optional
+import pandas as pd
+from utils.logger import get_logger
+from utils.records import PRICE_COLUMNS, PRODUCT_COLUMNS, ProductRecord, records_to_frame
+from utils.streaming import RecordSpool, write_spool_to_excel
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow нужен только для вывода в Parquet
+    pa = pq = None
+
+logger = get_logger(__name__)
+
+
+class Sink(ABC):
+    """
+    Приёмник записей о товарах. Записи копятся пачками по batch_size и
+    разбираются в типизированный DataFrame один раз на пачку.
+    """
+
+    extension = ""
+
+    def __init__(self, path: str, batch_size: int = 1000) -> None:
+        self.path = path
+        self.batch_size = batch_size
+        self.rows = 0
+        self._buffer: list[ProductRecord] = []
+
+    def write(self, record: ProductRecord) -> None:
+        """Принимает запись; пачка сбрасывается на диск при заполнении."""
+        self._buffer.append(record)
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Записывает накопленную пачку."""
+        if not self._buffer:
+            return
+        self._write_frame(records_to_frame(self._buffer))
+        self.rows += len(self._buffer)
+        self._buffer = []
+
+    @abstractmethod
+    def _write_frame(self, df: pd.DataFrame) -> None:
+        """Записывает типизированную пачку записей."""
+
+    def close(self) -> None:
+        """Сбрасывает остаток и закрывает приёмник."""
+        self.flush()
+        logger.info(f"Записано строк в {self.path}: {self.rows}")
+
+
+class CsvSink(Sink):
+    """Дописывает записи в CSV-файл."""
+
+    extension = "csv"
+
+    def __init__(self, path: str, batch_size: int = 1000) -> None:
+        super().__init__(path, batch_size)
+        self._header = True
+        open(path, "w", encoding="utf-8").close()
+
+    def _write_frame(self, df: pd.DataFrame) -> None:
+        df.to_csv(
+            self.path, mode="a", header=self._header, index=False, encoding="utf-8"
+        )
+        self._header = False
+
+
+class JsonlSink(Sink):
+    """Дописывает записи в файл JSON Lines."""
+
+    extension = "jsonl"
+
+    def __init__(self, path: str, batch_size: int = 1000) -> None:
+        super().__init__(path, batch_size)
+        open(path, "w", encoding="utf-8").close()
+
+    def _write_frame(self, df: pd.DataFrame) -> None:
+        lines = df.to_json(orient="records", lines=True, force_ascii=False)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines if lines.endswith("\n") else lines + "\n")
+
+
+class ParquetSink(Sink):
+    """Пишет записи в Parquet, по группе строк на каждую пачку."""
+
+    extension = "parquet"
+
+    def __init__(self, path: str, batch_size: int = 10_000) -> None:
+        if pa is None:
+            raise RuntimeError("Для вывода в Parquet нужен пакет pyarrow")
+        super().__init__(path, batch_size)
+        schema_fields = []
+        for column in PRODUCT_COLUMNS:
+            if column in ("Артикул", "Отзывы") or column in PRICE_COLUMNS:
+                schema_fields.append((column, pa.int64()))
+            elif column == "Рейтинг":
+                schema_fields.append((column, pa.float64()))
+            else:
+                schema_fields.append((column, pa.string()))
+        self.schema = pa.schema(schema_fields)
+        self._writer = pq.ParquetWriter(path, self.schema, compression="zstd")
+
+    def _write_frame(self, df: pd.DataFrame) -> None:
+        table = pa.Table.from_pandas(df, schema=self.schema, preserve_index=False)
+        self._writer.write_table(table)
+
+    def close(self) -> None:
+        super().close()
+        self._writer.close()
+
+
+class ExcelSink(Sink):
+    """
+    Пишет записи в .xlsx: Excel не поддерживает дозапись, поэтому строки
+    копятся в дисковом буфере и выгружаются write-only книгой при закрытии.
+    """
+
+    extension = "xlsx"
+
+    def __init__(self, path: str, batch_size: int = 10_000) -> None:
+        super().__init__(path, batch_size)
+        self._spool = RecordSpool(f"{path}.spool.jsonl")
+
+    def write(self, record: ProductRecord) -> None:
+        self._spool.add(record)
+
+    def _write_frame(self, df: pd.DataFrame) -> None:
+        # Записи уходят в дисковый буфер в write и разбираются при выгрузке
+        raise RuntimeError("ExcelSink не записывает пачки DataFrame")
+
+    def close(self) -> None:
+        try:
+            if self._spool.count:
+                write_spool_to_excel(
+                    self._spool, filename=self.path, chunk_size=self.batch_size
+                )
+            self.rows = self._spool.count
+        finally:
+            self._spool.close()
+
+
+class SqliteSink(Sink):
+    """
+    Пишет записи в SQLite: товары и продавцы лежат в отдельных таблицах,
+    продавцы связаны с товарами по ИНН. Повторный запуск обновляет строки
+    по артикулу и ИНН, а не дублирует их.
+    """
+
+    extension = "db"
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS sellers (
+        inn TEXT PRIMARY KEY,
+        name TEXT,
+        legal_name TEXT,
+        href TEXT,
+        updated_at REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS products (
+        sku INTEGER PRIMARY KEY,
+        name TEXT,
+        brand TEXT,
+        card_price INTEGER,
+        discount_price INTEGER,
+        price INTEGER,
+        rating REAL,
+        reviews INTEGER,
+        seller TEXT,
+        seller_inn TEXT REFERENCES sellers (inn),
+        url TEXT,
+        updated_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS products_seller ON products (seller);
+    CREATE INDEX IF NOT EXISTS products_seller_inn ON products (seller_inn);
+    """
+
+    UPSERT_SELLER_SQL = """
+    INSERT INTO sellers (inn, name, legal_name, href, updated_at)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT (inn) DO UPDATE SET
+        name = COALESCE(excluded.name, name),
+        legal_name = COALESCE(excluded.legal_name, legal_name),
+        href = COALESCE(excluded.href, href),
+        updated_at = excluded.updated_at
+    """
+
+    UPSERT_PRODUCT_SQL = """
+    INSERT INTO products (sku, name, brand, card_price, discount_price, price,
+                          rating, reviews, seller, seller_inn, url, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (sku) DO UPDATE SET
+        name = excluded.name,
+        brand = excluded.brand,
+        card_price = excluded.card_price,
+        discount_price = excluded.discount_price,
+        price = excluded.price,
+        rating = excluded.rating,
+        reviews = excluded.reviews,
+        seller = excluded.seller,
+        seller_inn = excluded.seller_inn,
+        url = excluded.url,
+        updated_at = excluded.updated_at
+    """
+
+    PRODUCT_FIELDS = (
+        "Артикул",
+        "Название товара",
+        "Бренд",
+        *PRICE_COLUMNS,
+        "Рейтинг",
+        "Отзывы",
+        "Продавец",
+        "ИНН продавца",
+        "Ссылка на товар",
+    )
+    SELLER_FIELDS = ("ИНН продавца", "Продавец", "Данные продавца", "Ссылка на продавца")
+
+    def __init__(self, path: str, batch_size: int = 5000) -> None:
+        super().__init__(path, batch_size)
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(self.SCHEMA)
+
+    def _write_frame(self, df: pd.DataFrame) -> None:
+        df = df.dropna(subset=["Артикул"]).astype(object)
+        df = df.where(df.notna(), None)
+        now = time.time()
+        sellers = df.loc[df["ИНН продавца"].notna(), list(self.SELLER_FIELDS)]
+        sellers = sellers.drop_duplicates(subset=["ИНН продавца"], keep="last")
+        with self.connection:
+            self.connection.executemany(
+                self.UPSERT_SELLER_SQL,
+                [(*row, now) for row in sellers.itertuples(index=False, name=None)],
+            )
+            self.connection.executemany(
+                self.UPSERT_PRODUCT_SQL,
+                [
+                    (*row, now)
+                    for row in df[list(self.PRODUCT_FIELDS)].itertuples(
+                        index=False, name=None
+                    )
+                ],
+            )
+
+    def products_by_inn(self, inn: str) -> list[tuple]:
+        """Возвращает товары продавца с данным ИНН."""
+        return self.connection.execute(
+            "SELECT p.sku, p.name, p.price, s.legal_name FROM products p "
+            "JOIN sellers s ON s.inn = p.seller_inn WHERE p.seller_inn = ?",
+            (str(inn),),
+        ).fetchall()
+
+    def close(self) -> None:
+        super().close()
+        self.connection.close()
+
+
+SINKS = {
+    sink.extension: sink
+    for sink in (ExcelSink, CsvSink, JsonlSink, ParquetSink, SqliteSink)
+}
+SINKS["sqlite"] = SqliteSink
+
+
+def open_sinks(output_file: str, formats: Optional[Iterable[str]] = None) -> list[Sink]:
+    """
+    Создаёт приёмники для перечисленных форматов (xlsx, csv, jsonl, parquet, db)
+    с общим именем файла; по умолчанию — только формат output_file.
+    """
+    base, ext = os.path.splitext(output_file)
+    formats = list(formats) if formats else [ext.lstrip(".") or "xlsx"]
+    sinks = []
+    for fmt in formats:
+        sink_class = SINKS.get(fmt.lower())
+        if sink_class is None:
+            raise ValueError(f"Неизвестный формат вывода: {fmt}")
+        sinks.append(sink_class(f"{base}.{sink_class.extension}"))
+    return sinks
@@ -0,0 +1,271 @@
+import json
+import sqlite3
+import threading
+import time
+from typing import Callable, Iterable, Iterator
+from utils.load_in_excel import write_data_to_excel
+from utils.logger import get_logger
+from utils.records import ProductRecord, sku_from_url
+from utils.retry_queue import FetchError
+from utils.sinks import ExcelSink, Sink
+
+logger = get_logger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    sku INTEGER PRIMARY KEY,
+    url TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    lease_owner TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS tasks_status_expires ON tasks (status, lease_expires);
+CREATE TABLE IF NOT EXISTS results (
+    sku INTEGER PRIMARY KEY,
+    data TEXT NOT NULL,
+    worker TEXT,
+    completed_at REAL NOT NULL
+);
+"""
+
+
+class WorkQueue:
+    """
+    Общая очередь ссылок на товары в файле SQLite для воркеров на разных машинах.
+
+    Воркер арендует пачку задач на lease_seconds и продлевает аренду, пока
+    работает; если он упал, аренда истекает и задачи выдаются другим воркерам.
+    Результаты сохраняются по артикулу, поэтому повторное выполнение безопасно.
+    Журнал WAL не работает на сетевых дисках, поэтому используется обычный
+    журнал с ожиданием блокировки.
+    """
+
+    def __init__(
+        self, path: str, lease_seconds: float = 120.0, max_attempts: int = 3
+    ) -> None:
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._local = threading.local()
+        self._connection().executescript(SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Возвращает соединение текущего потока."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA busy_timeout=30000")
+            self._local.connection = connection
+        return connection
+
+    def enqueue(self, urls: Iterable[str]) -> int:
+        """Добавляет ссылки в очередь; уже известные артикулы пропускаются."""
+        rows = [(sku, url) for url in urls if (sku := sku_from_url(url)) is not None]
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            before = connection.total_changes
+            connection.executemany(
+                "INSERT OR IGNORE INTO tasks (sku, url) VALUES (?, ?)", rows
+            )
+            added = connection.total_changes - before
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        logger.info(f"Добавлено в очередь задач: {added} из {len(rows)}")
+        return added
+
+    def lease(self, worker: str, batch_size: int = 10) -> list[tuple[int, str, int]]:
+        """
+        Арендует пачку свободных задач или задач с истёкшей арендой.
+        Возвращает (артикул, ссылка, номер попытки) для каждой задачи.
+        """
+        now = time.time()
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            # Задачи, аренда которых истекла на последней попытке, больше не выдаются
+            connection.execute(
+                "UPDATE tasks SET status = 'failed', lease_owner = NULL "
+                "WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?",
+                (now, self.max_attempts),
+            )
+            tasks = connection.execute(
+                "SELECT sku, url, attempts + 1 FROM tasks "
+                "WHERE (status = 'pending' OR (status = 'leased' AND lease_expires < ?)) "
+                "AND attempts < ? LIMIT ?",
+                (now, self.max_attempts, batch_size),
+            ).fetchall()
+            connection.executemany(
+                "UPDATE tasks SET status = 'leased', lease_owner = ?, "
+                "lease_expires = ?, attempts = attempts + 1 WHERE sku = ?",
+                [(worker, now + self.lease_seconds, sku) for sku, _, _ in tasks],
+            )
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        return tasks
+
+    def heartbeat(self, worker: str) -> int:
+        """Продлевает аренду всех задач воркера."""
+        cursor = self._connection().execute(
+            "UPDATE tasks SET lease_expires = ? "
+            "WHERE status = 'leased' AND lease_owner = ?",
+            (time.time() + self.lease_seconds, worker),
+        )
+        return cursor.rowcount
+
+    def complete(self, sku: int, data: dict, worker: str) -> None:
+        """Сохраняет результат задачи; повторная запись по артикулу заменяет прежнюю."""
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute(
+                "INSERT OR REPLACE INTO results (sku, data, worker, completed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (sku, json.dumps(data, ensure_ascii=False), worker, time.time()),
+            )
+            connection.execute(
+                "UPDATE tasks SET status = 'done', lease_owner = NULL, "
+                "lease_expires = NULL WHERE sku = ?",
+                (sku,),
+            )
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+    def fail(self, sku: int, worker: str) -> None:
+        """Возвращает задачу в очередь или помечает её неудачной после всех попыток."""
+        self._connection().execute(
+            "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' "
+            "ELSE 'pending' END, lease_owner = NULL, lease_expires = NULL "
+            "WHERE sku = ? AND lease_owner = ?",
+            (self.max_attempts, sku, worker),
+        )
+
+    def counts(self) -> dict[str, int]:
+        """Возвращает количество задач по статусам."""
+        rows = self._connection().execute(
+            "SELECT status, COUNT(*) FROM tasks GROUP BY status"
+        ).fetchall()
+        return dict(rows)
+
+    def unfinished(self) -> int:
+        """Возвращает количество задач, которые ещё могут быть выполнены."""
+        return self._connection().execute(
+            "SELECT COUNT(*) FROM tasks WHERE status IN ('pending', 'leased')"
+        ).fetchone()[0]
+
+    def records(self) -> Iterator[ProductRecord]:
+        """Перебирает собранные записи о товарах."""
+        cursor = self._connection().execute("SELECT data FROM results ORDER BY sku")
+        for (data,) in cursor:
+            yield ProductRecord.from_dict(json.loads(data))
+
+    def close(self) -> None:
+        """Закрывает соединение текущего потока."""
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+
+def process_queue(
+    queue: WorkQueue,
+    worker: str,
+    fetch: Callable[[str], dict],
+    batch_size: int = 10,
+    idle_sleep: float = 2.0,
+) -> int:
+    """
+    Выполняет задачи из очереди, пока в ней есть незавершённые, и продлевает
+    аренду из фонового потока. Возвращает количество выполненных задач.
+    """
+    stop = threading.Event()
+
+    def heartbeat() -> None:
+        while not stop.wait(queue.lease_seconds / 3):
+            try:
+                queue.heartbeat(worker)
+            except sqlite3.Error as e:
+                logger.warning(f"Ошибка продления аренды: {str(e)}")
+
+    heartbeat_thread = threading.Thread(target=heartbeat, daemon=True)
+    heartbeat_thread.start()
+    done = 0
+    started = time.perf_counter()
+    try:
+        while True:
+            tasks = queue.lease(worker, batch_size)
+            if not tasks:
+                if not queue.unfinished():
+                    break
+                # Остались задачи в аренде у других воркеров: ждём их или истечения аренды
+                time.sleep(idle_sleep)
+                continue
+            for sku, url, attempt in tasks:
+                try:
+                    data = fetch(url)
+                except FetchError as e:
+                    logger.warning(f"Ошибка при обработке {url}: {str(e)}")
+                    # После последней попытки сохраняется частичная запись, как в collect_data
+                    data = e.record if attempt >= queue.max_attempts else None
+                except Exception as e:
+                    logger.warning(f"Ошибка при обработке {url}: {str(e)}")
+                    data = None
+                if data and data.get("Артикул") is not None:
+                    queue.complete(sku, data, worker)
+                    done += 1
+                else:
+                    queue.fail(sku, worker)
+    finally:
+        stop.set()
+        heartbeat_thread.join()
+        elapsed = time.perf_counter() - started
+        rate = done / elapsed if elapsed else 0.0
+        logger.info(
+            f"Воркер {worker}: выполнено задач {done} за {elapsed:.1f} с "
+            f"({rate:.2f} товаров/с)",
+            extra={"metrics": {"worker": worker, "done": done, "seconds": elapsed}},
+        )
+    return done
+
+
+def export_results(
+    queue: WorkQueue,
+    output_file: str,
+    sinks: list[Sink] | None = None,
+    history: Sink | None = None,
+    diff: Sink | None = None,
+) -> int:
+    """
+    Выгружает собранные в очереди записи в Excel-файл. Если заданы sinks,
+    history или diff, записи по одной передаются им, как в collect_data;
+    без sinks в этом случае используется ExcelSink(output_file).
+    """
+    if sinks is None and history is None and diff is None:
+        products_data = {record.sku: record for record in queue.records()}
+        write_data_to_excel(products_data=products_data, filename=output_file)
+        logger.info(f"Выгружено записей из очереди: {len(products_data)} в {output_file}")
+        return len(products_data)
+
+    outputs = [*(sinks or [ExcelSink(output_file)]), history, diff]
+    outputs = [output for output in outputs if output is not None]
+    rows = 0
+    try:
+        for record in queue.records():
+            rows += 1
+            for output in outputs:
+                output.write(record)
+    finally:
+        for output in outputs:
+            try:
+                output.close()
+            except Exception as e:
+                logger.error(f"Ошибка при закрытии вывода {output.path}: {str(e)}")
+    logger.info(f"Выгружено записей из очереди: {rows}")
+    return rows
@@ -0,0 +1,78 @@
+import argparse
+import os
+import socket
+from contextlib import suppress
+from utils.logger import configure_logging, get_logger
+from utils.work_queue import WorkQueue, export_results, process_queue
+
+logger = get_logger("worker")
+
+
+def run_worker(
+    queue_path: str,
+    worker_id: str | None = None,
+    batch_size: int = 10,
+    lease_seconds: float = 120.0,
+    profile: int | None = None,
+) -> int:
+    """
+    Запускает браузер и обрабатывает задачи из общей очереди. profile — номер
+    постоянного клона профиля, который сохраняется между запусками; без него
+    воркер работает во временном клоне по pid, который удаляется при выходе,
+    поэтому несколько воркеров на одной машине не делят каталог профиля.
+    """
+    # Браузерный стек нужен только воркеру, но не выгрузке результатов
+    from utils.prepare_work import remove_profile, start_browser
+    from utils.product_data import collect_product_info
+
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    temporary_profile = profile is None
+    if temporary_profile:
+        profile = os.getpid()
+    queue = WorkQueue(queue_path, lease_seconds=lease_seconds)
+    driver = start_browser(worker=profile)
+    try:
+        return process_queue(
+            queue,
+            worker_id,
+            fetch=lambda url: collect_product_info(driver=driver, url=url),
+            batch_size=batch_size,
+        )
+    finally:
+        queue.close()
+        with suppress(Exception):
+            driver.quit()
+        if temporary_profile:
+            remove_profile(profile)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Воркер, обрабатывающий общую очередь товаров Ozon"
+    )
+    parser.add_argument("queue", help="Файл SQLite с очередью задач")
+    parser.add_argument("--worker-id", default=None)
+    parser.add_argument("--batch-size", type=int, default=10)
+    parser.add_argument("--lease", type=float, default=120.0)
+    parser.add_argument(
+        "--profile",
+        type=int,
+        default=None,
+        help="Номер постоянного клона профиля браузера (по умолчанию временный)",
+    )
+    parser.add_argument(
+        "--export", default=None, help="Только выгрузить результаты в Excel-файл"
+    )
+    args = parser.parse_args()
+
+    configure_logging(log_file="worker.log")
+    if args.export:
+        export_results(WorkQueue(args.queue), args.export)
+    else:
+        run_worker(
+            args.queue,
+            worker_id=args.worker_id,
+            batch_size=args.batch_size,
+            lease_seconds=args.lease,
+            profile=args.profile,
+        )